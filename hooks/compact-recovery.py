@@ -14,20 +14,21 @@ event that cannot inject context into the conversation.
 """
 
 import json
+import os
 import sys
-from pathlib import Path
 
 # Add hooks lib to path
-sys.path.insert(0, str(Path(__file__).parent / "lib"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "lib"))
 
 from db_reader import load_active_chain_state
+from json_codec import loads, read_stdin_bytes
 from session_state import ChainState, format_chain_reminder, load_session_state
 
 
 def parse_hook_input() -> dict:
     """Parse JSON input from Claude Code hook system."""
     try:
-        return json.load(sys.stdin)
+        return loads(read_stdin_bytes())
     except (json.JSONDecodeError, EOFError):
         return {}
 
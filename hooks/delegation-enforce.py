@@ -12,11 +12,12 @@ Behavior:
 """
 
 import json
+import os
 import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent / "lib"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "lib"))
 
+from json_codec import deny, loads, read_stdin_bytes
 from session_state import clear_delegation_state, load_session_state
 
 # Tools allowed during pending delegation (read-only + delegation itself)
@@ -31,7 +32,7 @@ def log(msg: str) -> None:
 def parse_hook_input() -> dict:
     """Parse JSON input from Claude Code hook system."""
     try:
-        return json.load(sys.stdin)
+        return loads(read_stdin_bytes())
     except json.JSONDecodeError:
         return {}
 
@@ -66,19 +67,12 @@ def main():
     model_part = f' model="{model_hint}"' if model_hint else ""
     log(f"delegation pending, BLOCKING {tool_name} (agent_type={agent_type})")
 
-    response = {
-        "hookSpecificOutput": {
-            "hookEventName": "PreToolUse",
-            "permissionDecision": "deny",
-            "permissionDecisionReason": (
-                f"Delegation pending: use Task tool "
-                f'(subagent_type="{agent_type}"{model_part}) '
-                f"before making direct edits. "
-                f"The ==> operator requires sub-agent execution."
-            ),
-        }
-    }
-    print(json.dumps(response))
+    deny(
+        f"Delegation pending: use Task tool "
+        f'(subagent_type="{agent_type}"{model_part}) '
+        f"before making direct edits. "
+        f"The ==> operator requires sub-agent execution."
+    )
     sys.exit(0)
 
 
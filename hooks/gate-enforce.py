@@ -10,20 +10,21 @@ Allows Claude to self-correct before the tool executes.
 """
 
 import json
+import os
 import re
 import sys
-from pathlib import Path
 
 # Add hooks lib to path
-sys.path.insert(0, str(Path(__file__).parent / "lib"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "lib"))
 
+from json_codec import deny, loads, read_stdin_bytes
 from session_state import load_session_state
 
 
 def parse_hook_input() -> dict:
     """Parse JSON input from Claude Code hook system."""
     try:
-        return json.load(sys.stdin)
+        return loads(read_stdin_bytes())
     except json.JSONDecodeError:
         return {}
 
@@ -34,7 +35,7 @@ def main():
     tool_name = hook_input.get("tool_name", "")
 
     # Only process prompt_engine calls
-    if "prompt_engine" not in tool_name:
+    if not tool_name.endswith("prompt_engine"):
         sys.exit(0)
 
     tool_input = hook_input.get("tool_input", {})
@@ -51,17 +52,10 @@ def main():
         if gate_verdict.get("overall", "").upper() == "FAIL":
             reason = str(gate_verdict.get("rationale", "unspecified"))[:50]
 
-            hook_response = {
-                "hookSpecificOutput": {
-                    "hookEventName": "PreToolUse",
-                    "permissionDecision": "deny",
-                    "permissionDecisionReason": (
-                        f"Gate FAIL: {reason}. Review the failing criteria, "
-                        "address the gaps in your output, then resubmit your verdict."
-                    ),
-                }
-            }
-            print(json.dumps(hook_response))
+            deny(
+                f"Gate FAIL: {reason}. Review the failing criteria, "
+                "address the gaps in your output, then resubmit your verdict."
+            )
             sys.exit(0)
     elif gate_verdict:
         # Parse verdict: "GATE_REVIEW: FAIL - reason" or "GATE_REVIEW: PASS - reason"
@@ -71,17 +65,10 @@ def main():
             reason_match = re.search(r"FAIL\s*[-:]\s*(.+)", gate_verdict, re.IGNORECASE)
             reason = reason_match.group(1).strip()[:50] if reason_match else "unspecified"
 
-            hook_response = {
-                "hookSpecificOutput": {
-                    "hookEventName": "PreToolUse",
-                    "permissionDecision": "deny",
-                    "permissionDecisionReason": (
-                        f"Gate FAIL: {reason}. Review the failing criteria, "
-                        "address the gaps in your output, then resubmit your verdict."
-                    ),
-                }
-            }
-            print(json.dumps(hook_response))
+            deny(
+                f"Gate FAIL: {reason}. Review the failing criteria, "
+                "address the gaps in your output, then resubmit your verdict."
+            )
             sys.exit(0)
 
     # Check 2: Resuming chain without required gate_verdict
@@ -92,16 +79,7 @@ def main():
 
         if state and state.get("pending_gate"):
             gate = state["pending_gate"]
-            hook_response = {
-                "hookSpecificOutput": {
-                    "hookEventName": "PreToolUse",
-                    "permissionDecision": "deny",
-                    "permissionDecisionReason": (
-                        f"Gate review required: {gate}. Review your output against the gate criteria before continuing."
-                    ),
-                }
-            }
-            print(json.dumps(hook_response))
+            deny(f"Gate review required: {gate}. Review your output against the gate criteria before continuing.")
             sys.exit(0)
 
     # All checks passed - allow tool execution
@@ -5,7 +5,8 @@ Loads and queries MCP prompt/gate metadata from SQLite resource_index.
 Uses db_reader for SQLite access to runtime-state/state.db (read-only).
 """
 
-from typing import TypedDict, cast
+import os
+from typing import NamedTuple, TypedDict, cast
 
 from db_reader import (
     get_prompt_by_id_from_db,
@@ -14,6 +15,7 @@ from db_reader import (
     load_gates,
     load_prompts,
 )
+from workspace import get_state_db_path
 
 
 class ArgumentInfo(TypedDict):
@@ -47,14 +49,143 @@ class GateInfo(TypedDict):
     triggers: list[str]
 
 
+# Mapping of work types to relevant gate keywords
+WORK_GATE_KEYWORDS: dict[str, list[str]] = {
+    "code": ["code", "quality", "test", "coverage"],
+    "research": ["research", "quality", "content", "accuracy"],
+    "security": ["security", "awareness", "pr-security"],
+    "documentation": ["content", "structure", "clarity", "educational"],
+}
+
+
+class _PromptIndexEntry(NamedTuple):
+    """Per-prompt match inputs derived once at cache load."""
+
+    prompt_id: str
+    data: PromptInfo
+    keywords: tuple[str, ...]
+    category: str
+    name_words: tuple[str, ...]  # lowercased name words longer than 3 chars
+    is_chain: bool
+    id_lower: str
+    id_words: frozenset[str]
+
+
+def _build_prompt_index(prompts: dict[str, PromptInfo]) -> list[_PromptIndexEntry]:
+    """Precompute lowercased/split prompt metadata so queries are pure substring tests."""
+    index: list[_PromptIndexEntry] = []
+    for prompt_id, data in prompts.items():
+        id_lower = prompt_id.lower()
+        index.append(
+            _PromptIndexEntry(
+                prompt_id=prompt_id,
+                data=data,
+                keywords=tuple(data.get("keywords", [])),
+                category=data.get("category", ""),
+                name_words=tuple(w for w in data.get("name", "").lower().split() if len(w) > 3),
+                is_chain=bool(data.get("is_chain")),
+                id_lower=id_lower,
+                id_words=frozenset(id_lower.replace("-", "_").split("_")),
+            )
+        )
+    return index
+
+
+def _get_prompt_index(cache: dict) -> list[_PromptIndexEntry]:
+    """Return the cache's precomputed index, building it for caches loaded elsewhere."""
+    index = cache.get("_index")
+    if index is None:
+        index = _build_prompt_index(cache.get("prompts", {}))
+    return index
+
+
+# Loaded caches keyed by kind ("prompts"/"gates"), valid while the state.db signature holds
+_loaded_caches: dict[str, tuple[tuple, dict | None]] = {}
+
+
+def _state_db_signature() -> tuple | None:
+    """
+    Identify the current state.db contents by path plus (mtime_ns, size) of the
+    database and its WAL file. The server writes in WAL mode, so new rows can land
+    in state.db-wal without touching state.db itself.
+    """
+    db_path = get_state_db_path()
+    if not db_path:
+        return None
+    signature: list = [str(db_path)]
+    for suffix in ("", "-wal"):
+        try:
+            st = os.stat(f"{db_path}{suffix}")
+            signature.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _load_cached(kind: str, loader) -> dict | None:
+    """Return loader()'s result, reusing the previous one while state.db is unchanged."""
+    signature = _state_db_signature()
+    if signature is None:
+        return loader()
+    entry = _loaded_caches.get(kind)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+    data = loader()
+    _loaded_caches[kind] = (signature, data)
+    return data
+
+
+def _load_prompts_indexed() -> dict | None:
+    cache = load_prompts()
+    if cache:
+        cache["_index"] = _build_prompt_index(cache.get("prompts", {}))
+    return cache
+
+
 def load_prompts_cache() -> dict | None:
-    """Load prompt metadata from SQLite resource_index."""
-    return load_prompts()
+    """
+    Load prompt metadata from SQLite resource_index.
+
+    Adds an "_index" entry (alongside db_reader's "_meta") holding the
+    precomputed match inputs used by match_prompts_to_intent and
+    fuzzy_match_prompt_id. Memoized until state.db changes.
+    """
+    return _load_cached("prompts", _load_prompts_indexed)
+
+
+def _build_work_type_index(gates: dict[str, GateInfo]) -> dict[str, list[str]]:
+    """
+    Resolve WORK_GATE_KEYWORDS against the gates once: work type -> matching gate
+    ids in cache order. A gate matches a keyword listed in its triggers or contained
+    in its lowercased name.
+    """
+    index: dict[str, list[str]] = {}
+    for work_type, keywords in WORK_GATE_KEYWORDS.items():
+        matched: list[str] = []
+        for gate_id, gate_data in gates.items():
+            gate_triggers = gate_data.get("triggers", [])
+            gate_name_lower = gate_data.get("name", "").lower()
+            if any(keyword in gate_triggers or keyword in gate_name_lower for keyword in keywords):
+                matched.append(gate_id)
+        index[work_type] = matched
+    return index
+
+
+def _load_gates_indexed() -> dict | None:
+    cache = load_gates()
+    if cache:
+        cache["_work_type_index"] = _build_work_type_index(cache.get("gates", {}))
+    return cache
 
 
 def load_gates_cache() -> dict | None:
-    """Load gate metadata from SQLite resource_index."""
-    return load_gates()
+    """
+    Load gate metadata from SQLite resource_index.
+
+    Adds a "_work_type_index" entry used by suggest_gates_for_work.
+    Memoized until state.db changes.
+    """
+    return _load_cached("gates", _load_gates_indexed)
 
 
 def get_prompt_by_id(prompt_id: str) -> PromptInfo | None:
@@ -75,31 +206,29 @@ def match_prompts_to_intent(user_prompt: str, max_results: int = 5) -> list[tupl
     prompt_lower = user_prompt.lower()
     matches: list[tuple[str, PromptInfo, int]] = []
 
-    for prompt_id, data in cache.get("prompts", {}).items():
+    for entry in _get_prompt_index(cache):
         score = 0
 
         # Keyword matching
-        for keyword in data.get("keywords", []):
+        for keyword in entry.keywords:
             if keyword in prompt_lower:
                 score += 10
 
         # Category matching
-        category = data.get("category", "")
-        if category in prompt_lower:
+        if entry.category in prompt_lower:
             score += 20
 
         # Name word matching
-        name_words = data.get("name", "").lower().split()
-        for word in name_words:
-            if len(word) > 3 and word in prompt_lower:
+        for word in entry.name_words:
+            if word in prompt_lower:
                 score += 15
 
         # Boost chains (more comprehensive)
-        if data.get("is_chain") and score > 0:
+        if entry.is_chain and score > 0:
             score += 5
 
         if score > 0:
-            matches.append((prompt_id, data, score))
+            matches.append((entry.prompt_id, entry.data, score))
 
     # Sort by score descending
     matches.sort(key=lambda x: x[2], reverse=True)
@@ -118,33 +247,21 @@ def suggest_gates_for_work(
     if not cache:
         return []
 
-    # Mapping of work types to relevant gate keywords
-    work_gate_mapping = {
-        "code": ["code", "quality", "test", "coverage"],
-        "research": ["research", "quality", "content", "accuracy"],
-        "security": ["security", "awareness", "pr-security"],
-        "documentation": ["content", "structure", "clarity", "educational"],
-    }
+    gates = cache.get("gates", {})
+    work_type_index = cache.get("_work_type_index")
+    if work_type_index is None:
+        work_type_index = _build_work_type_index(gates)
 
     suggested: list[tuple[str, GateInfo]] = []
     seen_ids: set[str] = set()
 
     for work_type in work_types:
-        keywords = work_gate_mapping.get(work_type, [])
-
-        for gate_id, gate_data in cache.get("gates", {}).items():
-            if gate_id in seen_ids:
-                continue
-
-            # Check if gate matches any keyword
-            gate_triggers = gate_data.get("triggers", [])
-            gate_name_lower = gate_data.get("name", "").lower()
-
-            for keyword in keywords:
-                if keyword in gate_triggers or keyword in gate_name_lower:
-                    suggested.append((gate_id, gate_data))
-                    seen_ids.add(gate_id)
-                    break
+        for gate_id in work_type_index.get(work_type, []):
+            if gate_id not in seen_ids:
+                suggested.append((gate_id, gates[gate_id]))
+                seen_ids.add(gate_id)
+        if len(suggested) >= 3:
+            break
 
     return suggested[:3]  # Limit to 3 suggestions
 
@@ -190,19 +307,26 @@ def levenshtein_distance(a: str, b: str) -> int:
     Same algorithm as TypeScript generatePromptSuggestions().
     """
     if len(a) < len(b):
-        return levenshtein_distance(b, a)
+        a, b = b, a
     if len(b) == 0:
         return len(a)
 
+    # Two preallocated rows swapped per iteration; the three-way min is inlined
+    # because a min() call per cell dominates the inner loop in CPython.
     previous_row = list(range(len(b) + 1))
-    for i, ca in enumerate(a):
-        current_row = [i + 1]
-        for j, cb in enumerate(b):
-            insertions = previous_row[j + 1] + 1
-            deletions = current_row[j] + 1
-            substitutions = previous_row[j] + (ca != cb)
-            current_row.append(min(insertions, deletions, substitutions))
-        previous_row = current_row
+    current_row = [0] * (len(b) + 1)
+    for i, ca in enumerate(a, 1):
+        current_row[0] = i
+        for j, cb in enumerate(b, 1):
+            cost = previous_row[j - 1] + (ca != cb)
+            insertion = previous_row[j] + 1
+            if insertion < cost:
+                cost = insertion
+            deletion = current_row[j - 1] + 1
+            if deletion < cost:
+                cost = deletion
+            current_row[j] = cost
+        previous_row, current_row = current_row, previous_row
 
     return previous_row[-1]
 
@@ -229,12 +353,14 @@ def fuzzy_match_prompt_id(query: str, max_results: int = 3) -> list[str]:
         return []
 
     query_lower = query.lower()
+    query_len = len(query_lower)
     query_words = set(query_lower.replace("-", "_").split("_"))
+    threshold = max(3, query_len // 2)
 
     scored: list[tuple[str, int]] = []
 
-    for prompt_id in cache.get("prompts", {}):
-        id_lower = prompt_id.lower()
+    for entry in _get_prompt_index(cache):
+        id_lower = entry.id_lower
         score = 0
 
         # Prefix match (highest value - user typing partial name)
@@ -242,18 +368,18 @@ def fuzzy_match_prompt_id(query: str, max_results: int = 3) -> list[str]:
             score += 100
 
         # Word overlap (medium value - related prompts)
-        id_words = set(id_lower.replace("-", "_").split("_"))
         for qw in query_words:
-            for iw in id_words:
+            for iw in entry.id_words:
                 if qw in iw or iw in qw:
                     score += 30
                     break
 
-        # Levenshtein distance (lower = better)
-        distance = levenshtein_distance(query_lower, id_lower)
-        threshold = max(3, len(query_lower) // 2)
-        if distance <= threshold:
-            score += max(0, 50 - distance * 10)
+        # Levenshtein distance (lower = better). The length difference is a lower
+        # bound on edit distance, so skip the DP when it already exceeds the threshold.
+        if abs(len(id_lower) - query_len) <= threshold:
+            distance = levenshtein_distance(query_lower, id_lower)
+            if distance <= threshold:
+                score += max(0, 50 - distance * 10)
 
         if score > 0:
             # Store lowercase ID to align with MCP server case-insensitive matching
@@ -17,15 +17,20 @@ Uses workspace resolution from workspace.py.
 """
 
 import asyncio
+import functools
 import json
+import math
 import os
+import random
 import subprocess
 import time
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Literal
 
-from workspace import get_runtime_state_dir
+from json_codec import loads as json_loads
+from workspace import ensure_dir, get_runtime_state_dir
 
 # === Configuration Classes ===
 
@@ -35,7 +40,7 @@ def _default_client() -> Literal["claude", "codex"]:
     return "codex" if os.environ.get("RALPH_SPAWN_CLIENT") == "codex" else "claude"
 
 
-@dataclass
+@dataclass(slots=True)
 class SpawnConfig:
     """Configuration for spawning a CLI agent instance (claude or codex)."""
 
@@ -60,6 +65,9 @@ class RetryConfig:
     max_delay_seconds: float = 30.0
     exponential_base: float = 2.0
     jitter: bool = True  # Add randomness to prevent thundering herd
+    # symmetric: ±25% around the exponential delay; full: uniform in [0, exponential delay];
+    # decorrelated: uniform in [base, 3 x previous delay], capped at max_delay_seconds
+    jitter_mode: Literal["symmetric", "decorrelated", "full"] = "decorrelated"
 
 
 @dataclass
@@ -68,10 +76,15 @@ class CircuitBreakerConfig:
 
     failure_threshold: int = 5  # Failures before opening circuit
     recovery_timeout_seconds: float = 60.0  # Time before attempting recovery
+    failure_decay_seconds: float = 300.0  # Time constant for forgetting old failures
+    # How far below failure_threshold the decayed count may be and still trip. A burst
+    # of failure_threshold failures decays slightly between attempts, so the count never
+    # reaches the threshold exactly; 0.0 requires that many effectively simultaneous failures.
+    failure_count_tolerance: float = 0.5
     half_open_max_calls: int = 1  # Calls allowed in half-open state
 
 
-@dataclass
+@dataclass(slots=True)
 class SpawnStats:
     """Token usage and cost statistics from Claude CLI."""
 
@@ -84,7 +97,7 @@ class SpawnStats:
     num_turns: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class SpawnResult:
     """Result from a spawned Claude CLI instance."""
 
@@ -120,53 +133,66 @@ class CircuitBreaker:
     """
 
     config: CircuitBreakerConfig = field(default_factory=CircuitBreakerConfig)
-    _state: str = field(default=CircuitBreakerState.CLOSED, init=False)
-    _failure_count: int = field(default=0, init=False)
+    # Tripped and not yet recovered: OPEN until _open_until, HALF_OPEN afterwards
+    _tripped: bool = field(default=False, init=False)
+    _open_until: float = field(default=0.0, init=False)
+    _failure_count: float = field(default=0.0, init=False)  # Exponentially decayed
     _last_failure_time: float = field(default=0.0, init=False)
     _half_open_calls: int = field(default=0, init=False)
 
     @property
     def state(self) -> str:
-        """Get current circuit state, transitioning if needed."""
-        if self._state == CircuitBreakerState.OPEN:
-            # Check if recovery timeout has passed
-            if time.time() - self._last_failure_time >= self.config.recovery_timeout_seconds:
-                self._state = CircuitBreakerState.HALF_OPEN
-                self._half_open_calls = 0
-        return self._state
+        """Get current circuit state (derived; reading it never mutates the breaker)."""
+        if not self._tripped:
+            return CircuitBreakerState.CLOSED
+        if time.time() < self._open_until:
+            return CircuitBreakerState.OPEN
+        return CircuitBreakerState.HALF_OPEN
 
     def can_execute(self) -> bool:
         """Check if a call is allowed in current state."""
-        state = self.state  # Triggers state transition check
-        if state == CircuitBreakerState.CLOSED:
-            return True
-        if state == CircuitBreakerState.HALF_OPEN:
-            return self._half_open_calls < self.config.half_open_max_calls
-        return False  # OPEN state
+        if not self._tripped:
+            return True  # CLOSED: no clock read on the hot path
+        if time.time() < self._open_until:
+            return False  # OPEN
+        return self._half_open_calls < self.config.half_open_max_calls
+
+    def _trip(self, now: float) -> None:
+        """Open (or re-open) the circuit for recovery_timeout_seconds from now."""
+        self._tripped = True
+        self._open_until = now + self.config.recovery_timeout_seconds
+        self._half_open_calls = 0
 
     def record_success(self) -> None:
         """Record a successful call."""
-        if self._state == CircuitBreakerState.HALF_OPEN:
+        if not self._tripped:
+            # Reset failure count on success
+            self._failure_count = 0.0
+        elif time.time() >= self._open_until:
             self._half_open_calls += 1
             if self._half_open_calls >= self.config.half_open_max_calls:
                 # Recovery confirmed, close circuit
-                self._state = CircuitBreakerState.CLOSED
-                self._failure_count = 0
-        elif self._state == CircuitBreakerState.CLOSED:
-            # Reset failure count on success
-            self._failure_count = 0
+                self._tripped = False
+                self._failure_count = 0.0
 
     def record_failure(self) -> None:
-        """Record a failed call."""
-        self._failure_count += 1
-        self._last_failure_time = time.time()
-
-        if self._state == CircuitBreakerState.HALF_OPEN:
-            # Recovery failed, reopen circuit
-            self._state = CircuitBreakerState.OPEN
-        elif self._failure_count >= self.config.failure_threshold:
+        """
+        Record a failed call.
+
+        Earlier failures decay by exp(-dt / failure_decay_seconds), so the circuit
+        trips on a failure rate rather than on a lifetime total.
+        """
+        now = time.time()
+        decay = math.exp(-(now - self._last_failure_time) / self.config.failure_decay_seconds)
+        self._failure_count = self._failure_count * decay + 1.0
+        self._last_failure_time = now
+
+        if self._tripped:
+            # Recovery failed (or a straggler failed while open): restart the open window
+            self._trip(now)
+        elif self._failure_count >= self.config.failure_threshold - self.config.failure_count_tolerance:
             # Too many failures, open circuit
-            self._state = CircuitBreakerState.OPEN
+            self._trip(now)
 
 
 # === Module-level circuit breaker instance ===
@@ -188,43 +214,61 @@ def reset_circuit_breaker() -> None:
 
 
 def _get_ralph_tasks_dir() -> Path:
-    """Get Ralph tasks directory for task files."""
+    """Get Ralph tasks directory for task files (created on first use)."""
     dev_fallback = Path(__file__).parent.parent.parent / "server" / "runtime-state"
     runtime_dir = get_runtime_state_dir(dev_fallback)
-    tasks_dir = runtime_dir / "ralph-tasks"
-    tasks_dir.mkdir(parents=True, exist_ok=True)
-    return tasks_dir
+    return ensure_dir(runtime_dir / "ralph-tasks")
 
 
-def _calculate_backoff_delay(attempt: int, config: RetryConfig) -> float:
-    """Calculate delay for exponential backoff with optional jitter."""
-    import random
+def _calculate_backoff_delay(attempt: int, config: RetryConfig, previous_delay: float | None = None) -> float:
+    """
+    Calculate delay for exponential backoff with optional jitter.
 
+    previous_delay is the delay slept before the last retry (None on the first);
+    only decorrelated jitter uses it.
+    """
     delay = config.base_delay_seconds * (config.exponential_base**attempt)
     delay = min(delay, config.max_delay_seconds)
 
     if config.jitter:
-        # Add ±25% jitter
-        jitter_range = delay * 0.25
-        delay += random.uniform(-jitter_range, jitter_range)
+        if config.jitter_mode == "decorrelated":
+            # Grows from the previous sleep rather than the attempt number, so workers
+            # that failed together drift apart from the first retry
+            previous = config.base_delay_seconds if previous_delay is None else previous_delay
+            delay = min(config.max_delay_seconds, random.uniform(config.base_delay_seconds, previous * 3))
+        elif config.jitter_mode == "full":
+            delay = random.uniform(0, delay)
+        else:
+            # Add ±25% jitter: scale uniformly within [0.75, 1.25)
+            delay *= 0.75 + 0.5 * random.random()
 
     return max(0, delay)
 
 
 def _build_command(config: SpawnConfig) -> list[str]:
     """Build the CLI command for the configured client."""
-    if config.client == "codex":
-        return _build_codex_command(config)
-    return _build_claude_command(config)
+    return list(
+        _build_command_tuple(config.client, config.max_budget_usd, config.output_format, config.working_directory)
+    )
+
 
+@functools.lru_cache(maxsize=32, typed=True)
+def _build_command_tuple(
+    client: str, max_budget_usd: float, output_format: str, working_directory: str | None
+) -> tuple[str, ...]:
+    """Command for the given command-shaping config fields, memoized across spawns and batches."""
+    if client == "codex":
+        return tuple(_build_codex_command(working_directory))
+    return tuple(_build_claude_command(max_budget_usd, output_format, working_directory))
 
-def _build_claude_command(config: SpawnConfig) -> list[str]:
+
+def _build_claude_command(max_budget_usd: float, output_format: str, working_directory: str | None) -> list[str]:
     """Build the claude CLI command for --print mode with tool execution."""
     cmd = [
         "claude",
         "--print",
-        f"--max-budget-usd={config.max_budget_usd}",
-        f"--output-format={config.output_format}",
+        f"--max-budget-usd={max_budget_usd}",
+        f"--output-format={output_format}",
         # Skip permission prompts to enable tool execution in --print mode
         "--dangerously-skip-permissions",
         # Enable file operation tools
@@ -232,13 +276,13 @@ def _build_claude_command(config: SpawnConfig) -> list[str]:
     ]
 
     # Add working directory to trusted paths if specified
-    if config.working_directory:
-        cmd.append(f"--add-dir={config.working_directory}")
+    if working_directory:
+        cmd.append(f"--add-dir={working_directory}")
 
     return cmd
 
 
-def _build_codex_command(config: SpawnConfig) -> list[str]:
+def _build_codex_command(working_directory: str | None) -> list[str]:
     """Build the codex CLI command for non-interactive (exec) mode.
 
     codex exec reads the prompt from stdin (same delivery as claude --print),
@@ -255,8 +299,8 @@ def _build_codex_command(config: SpawnConfig) -> list[str]:
     ]
 
     # Root the agent at the working directory if specified
-    if config.working_directory:
-        cmd.extend(["--cd", config.working_directory])
+    if working_directory:
+        cmd.extend(["--cd", working_directory])
 
     return cmd
 
@@ -268,9 +312,20 @@ def _cli_not_found_message(config: SpawnConfig) -> str:
     return "Claude CLI not found. Is claude-code installed?"
 
 
+_spawn_env: dict[str, str] | None = None
+
+
 def _get_spawn_env() -> dict[str, str]:
-    """Get environment for spawned process."""
-    return {**os.environ, "RALPH_SPAWNED": "true"}
+    """
+    Get environment for spawned process.
+
+    Snapshotted on first use and shared by every spawn; callers must not
+    mutate the returned dict.
+    """
+    global _spawn_env
+    if _spawn_env is None:
+        _spawn_env = {**os.environ, "RALPH_SPAWNED": "true"}
+    return _spawn_env
 
 
 def _parse_json_output(raw_output: str) -> tuple[str, SpawnStats | None]:
@@ -281,7 +336,7 @@ def _parse_json_output(raw_output: str) -> tuple[str, SpawnStats | None]:
         Tuple of (text_result, stats) where stats contains token usage and cost.
     """
     try:
-        data = json.loads(raw_output)
+        data = json_loads(raw_output)
 
         # Extract the actual result text
         result_text = data.get("result", raw_output)
@@ -307,6 +362,29 @@ def _parse_json_output(raw_output: str) -> tuple[str, SpawnStats | None]:
 # === Async Spawn Implementation ===
 
 
+async def _terminate(process: asyncio.subprocess.Process, grace: float = 2.0) -> None:
+    """
+    Stop a spawned process without risking an unbounded wait.
+
+    Sends SIGTERM, escalates to SIGKILL if the process outlives ``grace``
+    seconds, then closes stdin. asyncio releases the pipe transport once the
+    process has been waited on.
+    """
+    if process.returncode is None:
+        try:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), grace)
+            except asyncio.TimeoutError:
+                process.kill()
+                await asyncio.wait_for(process.wait(), grace)
+        except (ProcessLookupError, asyncio.TimeoutError):
+            pass
+
+    if process.stdin is not None:
+        process.stdin.close()
+
+
 async def spawn_claude_print_async(
     prompt: str,
     config: SpawnConfig | None = None,
@@ -339,6 +417,7 @@ async def spawn_claude_print_async(
     cwd = config.working_directory or os.getcwd()
     cmd = _build_command(config)
     retries_used = 0
+    delay: float | None = None  # Last backoff slept, for decorrelated jitter
 
     for attempt in range(retry_config.max_retries + 1):
         # Circuit breaker check
@@ -354,6 +433,7 @@ async def spawn_claude_print_async(
                 retries_used=retries_used,
             )
 
+        process = None
         try:
             # Create async subprocess with stdin for prompt delivery
             process = await asyncio.create_subprocess_exec(
@@ -368,7 +448,7 @@ async def spawn_claude_print_async(
             # Communicate with timeout - prompt via stdin
             try:
                 stdout, stderr = await asyncio.wait_for(
-                    process.communicate(input=prompt.encode()),
+                    process.communicate(prompt.encode()),
                     timeout=config.timeout_seconds,
                 )
 
@@ -391,13 +471,12 @@ async def spawn_claude_print_async(
                     return result
 
                 retries_used += 1
-                delay = _calculate_backoff_delay(attempt, retry_config)
+                delay = _calculate_backoff_delay(attempt, retry_config, delay)
                 await asyncio.sleep(delay)
 
             except asyncio.TimeoutError:
-                # Kill process on timeout
-                process.kill()
-                await process.wait()
+                # Stop process on timeout (SIGTERM, then SIGKILL)
+                await _terminate(process)
 
                 if circuit:
                     circuit.record_failure()
@@ -413,7 +492,7 @@ async def spawn_claude_print_async(
                     )
 
                 retries_used += 1
-                delay = _calculate_backoff_delay(attempt, retry_config)
+                delay = _calculate_backoff_delay(attempt, retry_config, delay)
                 await asyncio.sleep(delay)
 
         except FileNotFoundError:
@@ -443,9 +522,15 @@ async def spawn_claude_print_async(
                 )
 
             retries_used += 1
-            delay = _calculate_backoff_delay(attempt, retry_config)
+            delay = _calculate_backoff_delay(attempt, retry_config, delay)
             await asyncio.sleep(delay)
 
+        finally:
+            # Never leave a child running (e.g. when the caller cancels us). Shielded so
+            # a second cancellation can't abandon the child mid-escalation.
+            if process is not None and process.returncode is None:
+                await asyncio.shield(_terminate(process))
+
     # Should not reach here, but handle gracefully
     return SpawnResult(
         success=False,
@@ -496,7 +581,8 @@ def spawn_claude_print(prompt: str, config: SpawnConfig | None = None, task_id:
             cmd,
             input=prompt,
             capture_output=True,
-            text=True,
+            encoding="utf-8",
+            errors="replace",
             timeout=config.timeout_seconds,
             cwd=cwd,
             env=_get_spawn_env(),
@@ -559,7 +645,8 @@ def _spawn_claude_print_blocking(
             cmd,
             input=prompt,
             capture_output=True,
-            text=True,
+            encoding="utf-8",
+            errors="replace",
             timeout=config.timeout_seconds,
             cwd=cwd,
             env=_get_spawn_env(),
@@ -663,11 +750,13 @@ def parse_spawn_result(result: SpawnResult) -> dict:
     """
     output = result.output
 
-    # Try to parse as JSON if configured that way
-    try:
-        return json.loads(output)
-    except json.JSONDecodeError:
-        pass
+    # Try to parse as JSON if configured that way. Text results (including the
+    # result field already extracted by _parse_json_output) skip the attempt.
+    if output.lstrip()[:1] in ("{", "["):
+        try:
+            return json_loads(output)
+        except json.JSONDecodeError:
+            pass
 
     # Parse text output
     parsed = {
@@ -679,9 +768,10 @@ def parse_spawn_result(result: SpawnResult) -> dict:
     }
 
     # Look for PASS/FAIL in output
-    if "PASS" in output.upper():
+    output_upper = output.upper()
+    if "PASS" in output_upper:
         parsed["status"] = "PASS"
-    elif "FAIL" in output.upper():
+    elif "FAIL" in output_upper:
         parsed["status"] = "FAIL"
 
     return parsed
@@ -690,6 +780,57 @@ def parse_spawn_result(result: SpawnResult) -> dict:
 # === Batch Spawn (for parallel execution) ===
 
 
+async def spawn_batch_iter(
+    tasks: list[tuple[str, SpawnConfig | None]],
+    max_concurrent: int = 3,
+    retry_config: RetryConfig | None = None,
+) -> AsyncIterator[tuple[int, SpawnResult]]:
+    """
+    Spawn multiple Claude CLI instances, yielding results as they complete.
+
+    A pool of ``max_concurrent`` workers pulls tasks from a queue, so callers
+    can process (and release) each output while stragglers are still running.
+
+    Args:
+        tasks: List of (prompt, config) tuples
+        max_concurrent: Maximum concurrent spawns
+        retry_config: Retry configuration for all spawns
+
+    Yields:
+        (index, SpawnResult) pairs in completion order; index refers to tasks
+    """
+    pending: asyncio.Queue = asyncio.Queue()
+    for idx, (prompt, config) in enumerate(tasks):
+        pending.put_nowait((idx, prompt, config))
+    completed: asyncio.Queue = asyncio.Queue()
+
+    async def worker() -> None:
+        while True:
+            try:
+                idx, prompt, config = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                result = await spawn_claude_print_async(prompt, config, retry_config)
+            except Exception as e:
+                await completed.put((idx, e))
+                return
+            await completed.put((idx, result))
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(min(max_concurrent, len(tasks)))]
+    try:
+        for _ in range(len(tasks)):
+            idx, outcome = await completed.get()
+            if isinstance(outcome, Exception):
+                raise outcome
+            yield idx, outcome
+    finally:
+        # Consumer stopped early or a spawn raised: don't leave workers running
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
 async def spawn_batch_async(
     tasks: list[tuple[str, SpawnConfig | None]],
     max_concurrent: int = 3,
@@ -706,11 +847,7 @@ async def spawn_batch_async(
     Returns:
         List of SpawnResults in same order as tasks
     """
-    semaphore = asyncio.Semaphore(max_concurrent)
-
-    async def spawn_with_limit(prompt: str, config: SpawnConfig | None) -> SpawnResult:
-        async with semaphore:
-            return await spawn_claude_print_async(prompt, config, retry_config)
-
-    coros = [spawn_with_limit(prompt, config) for prompt, config in tasks]
-    return await asyncio.gather(*coros)
+    by_index: dict[int, SpawnResult] = {}
+    async for idx, result in spawn_batch_iter(tasks, max_concurrent, retry_config):
+        by_index[idx] = result
+    return [by_index[idx] for idx in range(len(tasks))]
@@ -28,24 +28,39 @@ DEFAULT_CONFIG: Config = {
 }
 
 
+# (path, mtime_ns, size) of the last parsed config file and its result
+_config_cache: tuple[tuple, Config] | None = None
+
+
 def load_config() -> Config:
     """
     Load configuration from server/config.json.
     Returns default config if file not found or parse error.
+
+    The parsed result is reused until the file's mtime or size changes.
     """
+    global _config_cache
     # Try workspace-aware path first
     server_dir = get_server_dir(Path(__file__).parent.parent.parent / "server")
     config_path = server_dir / "config.json"
 
-    if not config_path.exists():
+    try:
+        st = config_path.stat()
+    except OSError:
         return DEFAULT_CONFIG
 
+    signature = (str(config_path), st.st_mtime_ns, st.st_size)
+    if _config_cache is not None and _config_cache[0] == signature:
+        return _config_cache[1]
+
     try:
         with open(config_path, encoding="utf-8") as f:
             config = json.load(f)
-            return config
     except (json.JSONDecodeError, OSError):
-        return DEFAULT_CONFIG
+        config = DEFAULT_CONFIG
+
+    _config_cache = (signature, config)
+    return config
 
 
 def get_hooks_config() -> HooksConfig:
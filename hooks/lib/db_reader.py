@@ -10,6 +10,7 @@ import json
 import os
 import sqlite3
 
+from json_codec import loads as json_loads
 from workspace import get_state_db_path
 
 
@@ -324,7 +325,7 @@ def _parse_json_field(raw: object) -> object:
     if not isinstance(raw, str) or raw.strip() == "":
         return None
     try:
-        return json.loads(raw)
+        return json_loads(raw)
     except json.JSONDecodeError:
         return None
 
@@ -353,7 +354,7 @@ def _load_from_session_table(conn: sqlite3.Connection) -> dict | None:
         if not state_json:
             continue
 
-        session = json.loads(state_json)
+        session = json_loads(state_json)
         return _session_to_hook_state(session)
 
     return None
@@ -387,7 +388,7 @@ def _load_from_run_registry(conn: sqlite3.Connection) -> dict | None:
         if not state_json:
             continue
 
-        registry = json.loads(state_json)
+        registry = json_loads(state_json)
         runs = registry.get("runs", {})
 
         for session in runs.values():
@@ -471,6 +472,6 @@ def _parse_metadata(metadata_json: str | None) -> dict:
     if not metadata_json:
         return {}
     try:
-        return json.loads(metadata_json)
+        return json_loads(metadata_json)
     except (json.JSONDecodeError, TypeError):
         return {}
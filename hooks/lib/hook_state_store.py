@@ -12,7 +12,7 @@ import time
 from pathlib import Path
 from typing import Any
 
-from workspace import get_runtime_state_dir
+from workspace import ensure_dir, get_runtime_state_dir
 
 LOCK_RETRIES = 80
 LOCK_RETRY_DELAY_SECONDS = 0.025
@@ -25,8 +25,7 @@ TABLE_NAMES = {TABLE_CHAIN_SESSION_STATE, TABLE_RALPH_SESSION_STATE}
 def get_hooks_state_db_path() -> Path:
     """Get path to hooks-state.db in runtime-state."""
     dev_fallback = Path(__file__).parent.parent.parent / "runtime-state"
-    runtime_dir = get_runtime_state_dir(dev_fallback)
-    runtime_dir.mkdir(parents=True, exist_ok=True)
+    runtime_dir = ensure_dir(get_runtime_state_dir(dev_fallback))
     return runtime_dir / "hooks-state.db"
 
 
@@ -76,7 +75,7 @@ def save_state(table_name: str, session_id: str, state: dict[str, Any]) -> None:
             INSERT OR REPLACE INTO {table_name} (session_id, state_json, updated_at)
             VALUES (?, ?, datetime('now'))
             """,
-            (session_id, json.dumps(state)),
+            (session_id, json.dumps(state, separators=(",", ":"))),
         )
         conn.commit()
         conn.close()
@@ -0,0 +1,85 @@
+"""
+JSON encoding/decoding for Claude Code hooks with optional orjson acceleration.
+
+orjson parses str or UTF-8 bytes directly and is several times faster than
+the stdlib on the payloads hooks handle (state rows, metadata columns, hook
+input). Falls back to the stdlib json module when orjson is not installed.
+
+orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers keep
+catching json.JSONDecodeError either way.
+
+Hook responses go out through write_stdout (and deny, for PreToolUse
+denials), so every hook emits the same compact encoding.
+"""
+
+import json
+import sys
+from typing import Any
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def loads(data: str | bytes | bytearray) -> Any:
+    """Decode a JSON document from str or UTF-8 bytes."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, *, indent: bool = False) -> bytes:
+    """
+    Encode obj as UTF-8 JSON bytes, compact or with 2-space indentation.
+
+    Non-ASCII text is written as-is rather than \\u-escaped; the stdlib fallback
+    uses orjson's separators so output shape doesn't depend on which is installed.
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def read_stdin_bytes() -> bytes:
+    """
+    Read all of stdin as raw bytes, skipping a text-layer decode that loads()
+    would only redo. Text streams without a .buffer (e.g. io.StringIO test
+    doubles) are read and encoded as UTF-8.
+    """
+    stream = getattr(sys.stdin, "buffer", sys.stdin)
+    data = stream.read()
+    return data.encode("utf-8") if isinstance(data, str) else data
+
+
+def write_stdout(obj: Any) -> None:
+    """
+    Write obj to stdout as one line of JSON, straight to the binary layer when
+    there is one. Pending text output is flushed first so ordering is kept;
+    text-only streams (e.g. redirect_stdout targets) get the decoded line.
+    """
+    data = dumps(obj) + b"\n"
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.write(data.decode("utf-8"))
+        return
+    sys.stdout.flush()
+    buffer.write(data)
+    buffer.flush()
+
+
+def deny(reason: str) -> None:
+    """Write the PreToolUse hook response denying the tool call."""
+    write_stdout(
+        {
+            "hookSpecificOutput": {
+                "hookEventName": "PreToolUse",
+                "permissionDecision": "deny",
+                "permissionDecisionReason": reason,
+            }
+        }
+    )
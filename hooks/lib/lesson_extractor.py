@@ -19,8 +19,10 @@ class ExtractedLesson(NamedTuple):
     pattern_matched: str | None
 
 
+_FLAGS = re.IGNORECASE | re.MULTILINE
+
 # Patterns ordered by specificity (more specific = higher confidence)
-LESSON_PATTERNS = [
+_RAW_LESSON_PATTERNS = [
     # High confidence: explicit realizations
     (r"I (?:now )?(?:realize|understand|see) (?:that |now )?(.+?)(?:\.|$)", 0.9, "realization"),
     (r"(?:The )?(?:root )?(?:cause|issue|problem|bug|error) (?:is|was|seems to be) (.+?)(?:\.|$)", 0.9, "root_cause"),
@@ -41,6 +43,86 @@ LESSON_PATTERNS = [
     (r"(?:Error|Warning|Issue): (.+?)(?:\.|$)", 0.5, "error_message"),
 ]
 
+# Compiled once at import: (pattern, confidence, name)
+LESSON_PATTERNS: list[tuple[re.Pattern[str], float, str]] = [
+    (re.compile(pattern, _FLAGS), confidence, name) for pattern, confidence, name in _RAW_LESSON_PATTERNS
+]
+
+# Every lesson pattern needs one of these (lowercase) words, so a response containing
+# none of them (pure code, logs) can skip the regex scan
+_TRIGGER_TOKENS = (
+    "realize",
+    "understand",
+    " see",
+    "cause",
+    "issue",
+    "problem",
+    "bug",
+    "error",
+    "means",
+    "indicates",
+    "suggests",
+    "implies",
+    "so ",
+    "so,",
+    "therefore",
+    "thus",
+    "hence",
+    "turns out",
+    "appears",
+    "solution",
+    "fix",
+    "answer",
+    "notice",
+    "found",
+    "discovered",
+    "looking at",
+    "after examining",
+    "upon inspection",
+    "fail",
+    "warning",
+)
+# Non-ASCII characters that re.IGNORECASE matches to an ASCII letter but str.lower()
+# doesn't map to it (the Kelvin sign already lowercases to "k")
+_IGNORECASE_ASCII_FOLDS = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s"})
+
+_APPROACH_PATTERNS = [
+    re.compile(pattern, _FLAGS)
+    for pattern in (
+        r"(?:I )?(?:tried|attempted|changed|modified|updated|added|removed|fixed|refactored) (.+?)(?:\.|$)",
+        r"(?:Let me |I'll |I will |Going to )(.+?)(?:\.|$)",
+        r"(?:The )?(?:change|modification|update|fix) (?:I made |was )(.+?)(?:\.|$)",
+    )
+]
+
+# Leading filler phrases, one optional group per kind. Groups apply in sequence, so
+# "I think we need to fix X" loses both the hedge and the "we need to".
+_FILLER_RE = re.compile(
+    r"^(?:I think |I believe |It seems |Perhaps |Maybe |Probably )?"
+    r"(?:we need to |we should |we must |we have to )?"
+    r"(?:you need to |you should |you must |you have to )?",
+    re.IGNORECASE,
+)
+
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Words marking a line as carrying real error info. ASCII-only case folding matches
+# the str.lower() comparison it replaces.
+_ERROR_INDICATOR_RE = re.compile(r"error|fail|expected|received|cannot|undefined|null", re.IGNORECASE | re.ASCII)
+
+# Failure categories in priority order: the first category with any keyword present wins
+_FAILURE_CLASSIFICATIONS = (
+    ("syntax_error", ("syntaxerror", "unexpected token", "parsing error")),
+    ("type_error", ("typeerror", "type mismatch", "cannot read property", "undefined is not")),
+    ("import_error", ("cannot find module", "module not found", "importerror", "no module named")),
+    ("test_failure", ("fail", "expected", "received", "assertion", "test failed")),
+    ("lint_error", ("eslint", "lint", "prettier", "formatting")),
+    ("build_error", ("build failed", "compilation error", "cannot compile")),
+    ("runtime_error", ("runtime error", "exception", "crash", "segfault")),
+    ("timeout", ("timeout", "timed out", "exceeded")),
+    ("permission_error", ("permission denied", "access denied", "eacces")),
+)
+
 
 def extract_lesson(claude_response: str) -> ExtractedLesson:
     """
@@ -51,10 +133,15 @@ def extract_lesson(claude_response: str) -> ExtractedLesson:
     if not claude_response or not claude_response.strip():
         return ExtractedLesson("No response to analyze", 0.0, None)
 
+    folded = claude_response if claude_response.isascii() else claude_response.translate(_IGNORECASE_ASCII_FOLDS)
+    folded = folded.lower()
+    if not any(token in folded for token in _TRIGGER_TOKENS):
+        return ExtractedLesson(_extract_fallback_lesson(claude_response), 0.3, "fallback")
+
     best_match: ExtractedLesson | None = None
 
     for pattern, confidence, pattern_name in LESSON_PATTERNS:
-        match = re.search(pattern, claude_response, re.IGNORECASE | re.MULTILINE)
+        match = pattern.search(claude_response)
         if match:
             insight = match.group(1).strip()
             # Clean up the insight
@@ -78,13 +165,7 @@ def _clean_insight(insight: str) -> str:
     insight = insight.strip().strip("\"'")
 
     # Remove common filler phrases
-    filler_patterns = [
-        r"^(?:I think |I believe |It seems |Perhaps |Maybe |Probably )",
-        r"^(?:we need to |we should |we must |we have to )",
-        r"^(?:you need to |you should |you must |you have to )",
-    ]
-    for pattern in filler_patterns:
-        insight = re.sub(pattern, "", insight, flags=re.IGNORECASE)
+    insight = _FILLER_RE.sub("", insight, count=1)
 
     # Capitalize first letter
     if insight:
@@ -97,23 +178,43 @@ def _clean_insight(insight: str) -> str:
     return insight
 
 
+def _last_paragraphs(text: str, limit: int) -> list[str]:
+    """
+    Return up to `limit` trailing non-empty paragraphs (stripped), last first.
+
+    Walks back from the end with rfind instead of splitting the whole text;
+    yields the same paragraphs as splitting on "\n\n" and dropping blanks.
+    """
+    paragraphs: list[str] = []
+    end = len(text)
+    while len(paragraphs) < limit:
+        separator = text.rfind("\n\n", 0, end)
+        paragraph = text[separator + 2 if separator != -1 else 0 : end].strip()
+        if paragraph:
+            paragraphs.append(paragraph)
+        if separator == -1:
+            break
+        end = separator
+    return paragraphs
+
+
 def _extract_fallback_lesson(response: str) -> str:
     """Extract a fallback lesson from the last paragraph or sentence."""
-    # Split into paragraphs
-    paragraphs = [p.strip() for p in response.split("\n\n") if p.strip()]
+    # Only the last two paragraphs can matter
+    paragraphs = _last_paragraphs(response, 2)
 
     if not paragraphs:
         return "Unable to extract lesson"
 
     # Try the last paragraph
-    last_para = paragraphs[-1]
+    last_para = paragraphs[0]
 
     # If it's a code block, try the paragraph before
     if last_para.startswith("```") and len(paragraphs) > 1:
-        last_para = paragraphs[-2]
+        last_para = paragraphs[1]
 
     # Get the last sentence
-    sentences = re.split(r"(?<=[.!?])\s+", last_para)
+    sentences = _SENTENCE_SPLIT_RE.split(last_para)
     sentences = [s.strip() for s in sentences if s.strip() and len(s.strip()) > 20]
 
     if sentences:
@@ -129,14 +230,8 @@ def extract_approach(claude_response: str) -> str:
 
     Looks for action-oriented statements about what was attempted.
     """
-    approach_patterns = [
-        r"(?:I )?(?:tried|attempted|changed|modified|updated|added|removed|fixed|refactored) (.+?)(?:\.|$)",
-        r"(?:Let me |I'll |I will |Going to )(.+?)(?:\.|$)",
-        r"(?:The )?(?:change|modification|update|fix) (?:I made |was )(.+?)(?:\.|$)",
-    ]
-
-    for pattern in approach_patterns:
-        match = re.search(pattern, claude_response, re.IGNORECASE | re.MULTILINE)
+    for pattern in _APPROACH_PATTERNS:
+        match = pattern.search(claude_response)
         if match:
             approach = _clean_insight(match.group(1))
             if approach and len(approach) > 10:
@@ -153,19 +248,7 @@ def classify_failure(error_output: str) -> str:
     """
     error_output_lower = error_output.lower()
 
-    classifications = [
-        ("syntax_error", ["syntaxerror", "unexpected token", "parsing error"]),
-        ("type_error", ["typeerror", "type mismatch", "cannot read property", "undefined is not"]),
-        ("import_error", ["cannot find module", "module not found", "importerror", "no module named"]),
-        ("test_failure", ["fail", "expected", "received", "assertion", "test failed"]),
-        ("lint_error", ["eslint", "lint", "prettier", "formatting"]),
-        ("build_error", ["build failed", "compilation error", "cannot compile"]),
-        ("runtime_error", ["runtime error", "exception", "crash", "segfault"]),
-        ("timeout", ["timeout", "timed out", "exceeded"]),
-        ("permission_error", ["permission denied", "access denied", "eacces"]),
-    ]
-
-    for category, keywords in classifications:
+    for category, keywords in _FAILURE_CLASSIFICATIONS:
         if any(kw in error_output_lower for kw in keywords):
             return category
 
@@ -181,25 +264,18 @@ def summarize_error(error_output: str, max_length: int = 150) -> str:
     if not error_output or not error_output.strip():
         return "No error output"
 
-    lines = error_output.strip().split("\n")
-
-    # Look for lines that contain actual error info
-    error_indicators = ["error", "fail", "expected", "received", "cannot", "undefined", "null"]
-
-    for line in lines:
-        line_lower = line.lower()
-        if any(ind in line_lower for ind in error_indicators):
-            clean_line = line.strip()
-            if len(clean_line) > max_length:
-                return clean_line[: max_length - 3] + "..."
-            return clean_line
-
-    # Fallback: return first non-empty line
-    for line in lines:
-        if line.strip():
-            clean_line = line.strip()
-            if len(clean_line) > max_length:
-                return clean_line[: max_length - 3] + "..."
-            return clean_line
-
-    return "Error details unavailable"
+    text = error_output.strip()
+
+    # Look for the first line that contains actual error info
+    match = _ERROR_INDICATOR_RE.search(text)
+    if match:
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        line_end = text.find("\n", match.end())
+        clean_line = text[line_start : line_end if line_end != -1 else len(text)].strip()
+    else:
+        # Fallback: first line (never blank once the output is stripped)
+        clean_line = text.split("\n", 1)[0].strip()
+
+    if len(clean_line) > max_length:
+        return clean_line[: max_length - 3] + "..."
+    return clean_line
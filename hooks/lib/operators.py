@@ -73,25 +73,61 @@ def _resolve_contract_path() -> Path | None:
 # Load once at import time
 OPERATORS = _load_operators()
 
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+def _literal_text(pattern: re.Pattern[str]) -> str | None:
+    """Return the pattern's text if it matches only itself (e.g. "-->"), else None."""
+    text = pattern.pattern
+    if not text or pattern.flags & re.IGNORECASE or _REGEX_METACHARS.intersection(text):
+        return None
+    return text
+
+
+# Hot-path view of OPERATORS: (operator_id, pattern, has_tuple_groups, literal).
+# findall returns tuples only for patterns with more than one group, which need
+# flattening; literal patterns (chain, delegation) are counted with str.count.
+_OP_TABLE: tuple[tuple[str, re.Pattern[str], bool, str | None], ...] = tuple(
+    (op_id, info["pattern"], info["pattern"].groups > 1, _literal_text(info["pattern"]))
+    for op_id, info in OPERATORS.items()
+)
+_OP_BY_ID = {entry[0]: entry for entry in _OP_TABLE}
+
+
+def _find_matches(pattern: re.Pattern[str], has_tuple_groups: bool, literal: str | None, message: str) -> list[str]:
+    """Run pattern over message, flattening multi-group results to non-empty captures."""
+    if literal is not None:
+        # Same non-overlapping occurrences findall would return, via C-level substring search
+        return [literal] * message.count(literal)
+    if has_tuple_groups:
+        # Collect captures straight from the match objects rather than materializing
+        # findall's tuple list and flattening it in a second pass
+        captures: list[str] = []
+        for match in pattern.finditer(message):
+            captures.extend(group for group in match.groups() if group)
+        return captures
+    return pattern.findall(message)
+
 
 def detect_operator(message: str, operator_id: str) -> list[str]:
     """
     Detect operator matches in message.
     Returns list of captured groups or empty list if no match.
     """
-    if operator_id not in OPERATORS:
+    entry = _OP_BY_ID.get(operator_id)
+    if entry is None:
         return []
-    pattern = OPERATORS[operator_id]["pattern"]
-    matches = pattern.findall(message)
-    # Flatten tuple results from groups
-    if matches and isinstance(matches[0], tuple):
-        return [m for group in matches for m in group if m]
-    return list(matches)
+    _, pattern, has_tuple_groups, literal = entry
+    return _find_matches(pattern, has_tuple_groups, literal, message)
 
 
 def detect_all_operators(message: str) -> dict[str, list[str]]:
     """Detect all operators in message. Returns dict of operator_id -> matches."""
-    return {op_id: matches for op_id in OPERATORS if (matches := detect_operator(message, op_id))}
+    return {
+        op_id: matches
+        for op_id, pattern, has_tuple_groups, literal in _OP_TABLE
+        if (matches := _find_matches(pattern, has_tuple_groups, literal, message))
+    }
 
 
 def get_delimiter_symbols() -> list[str]:
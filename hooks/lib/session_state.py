@@ -4,6 +4,7 @@ Tracks chain/gate state per conversation session via SQLite (hooks-state.db).
 """
 
 import re
+from itertools import islice
 from typing import Any, TypedDict, cast
 
 from hook_state_store import (
@@ -14,6 +15,21 @@ from hook_state_store import (
     save_state,
 )
 
+# prompt_engine response markers (see parse_prompt_engine_response). Each search is
+# guarded by a literal the pattern cannot match without, so responses lacking a
+# marker cost a substring scan instead of a regex run.
+_STEP_RE = re.compile(r"(?:[Ss]tep|[Pp]rogress|[Cc]omplete)\s*\(?(\d+)\s*(?:of|/)\s*(\d+)")
+_CHAIN_ID_RE = re.compile(r"(chain-[a-zA-Z0-9_#-]+)")
+_GATE_REVIEW_RE = re.compile(r"\*\*(?:Structural \+ Gate |Structural |Gate )?Review Required\*\*")
+_GATES_LIST_RE = re.compile(r"\*\*Gates\*\*:\s*(.+?)(?:\n|$)")
+_GATE_VERDICTS_RE = re.compile(r"GATE_VERDICTS:\s*\n((?:\[\d+\].*\n?)+)")
+_GATE_VERDICT_LABEL_RE = re.compile(r"\[\d+\]\s*(?:PASS|FAIL)\s*-\s*([^:]+)")
+_REVIEW_ATTEMPT_RE = re.compile(r"\(attempt\s+(\d+)/(\d+)\)")
+_INLINE_GATE_NAME_RE = re.compile(r"###\s*([A-Za-z][A-Za-z0-9 _-]+)\n")
+_CRITERIA_RE = re.compile(r"[-•]\s*(.+?)(?:\n|$)")
+_SHELL_VERIFY_RE = re.compile(r"Shell verification:\s*(.+?)(?:\n|$)")
+_VERIFY_ATTEMPT_RE = re.compile(r"Attempt\s+(\d+)/(\d+)")
+
 
 class ChainState(TypedDict, total=False):
     chain_id: str
@@ -95,14 +111,16 @@ def parse_prompt_engine_response(response: str | dict) -> ChainState | None:
 
     # Detect step indicators: "Step 1 of 3", "step 2/4", "Progress 1/2",
     # "Chain complete (2/2)", "complete (2/2)", etc.
-    step_match = re.search(r"(?:[Ss]tep|[Pp]rogress|[Cc]omplete)\s*\(?(\d+)\s*(?:of|/)\s*(\d+)", content)
+    step_match = (
+        _STEP_RE.search(content) if ("tep" in content or "rogress" in content or "omplete" in content) else None
+    )
     if step_match:
         state["current_step"] = int(step_match.group(1))
         state["total_steps"] = int(step_match.group(2))
 
     # Detect chain_id from resume token pattern: "chain-<name>#<run>"
     # Must start with "chain-" (hyphen) to avoid matching literal "chain_id" parameter names
-    chain_match = re.search(r"(chain-[a-zA-Z0-9_#-]+)", content)
+    chain_match = _CHAIN_ID_RE.search(content) if "chain-" in content else None
     if chain_match:
         state["chain_id"] = chain_match.group(1)
 
@@ -113,8 +131,8 @@ def parse_prompt_engine_response(response: str | dict) -> ChainState | None:
     #   **Structural Review Required** (attempt X/Y) (legacy)
     #   **Structural + Gate Review Required**        (legacy)
     # Followed by: **Gates**: gate-id-1, gate-id-2
-    gate_review_match = re.search(r"\*\*(?:Structural \+ Gate |Structural |Gate )?Review Required\*\*", content)
-    gates_list_match = re.search(r"\*\*Gates\*\*:\s*(.+?)(?:\n|$)", content)
+    gate_review_match = _GATE_REVIEW_RE.search(content) if "Review Required**" in content else None
+    gates_list_match = _GATES_LIST_RE.search(content) if "**Gates**:" in content else None
 
     if gate_review_match or gates_list_match:
         # Extract gate IDs from **Gates**: id1, id2
@@ -124,14 +142,14 @@ def parse_prompt_engine_response(response: str | dict) -> ChainState | None:
 
         # Fallback: extract gate names from GATE_VERDICTS template in CTA
         if not state["pending_gate"]:
-            verdicts_match = re.search(r"GATE_VERDICTS:\s*\n((?:\[\d+\].*\n?)+)", content)
+            verdicts_match = _GATE_VERDICTS_RE.search(content) if "GATE_VERDICTS:" in content else None
             if verdicts_match:
-                gate_labels = re.findall(r"\[\d+\]\s*(?:PASS|FAIL)\s*-\s*([^:]+)", verdicts_match.group(1))
+                gate_labels = _GATE_VERDICT_LABEL_RE.findall(verdicts_match.group(1))
                 if gate_labels:
                     state["pending_gate"] = ", ".join(g.strip() for g in gate_labels)
 
         # Extract attempt info: (attempt X/Y)
-        attempt_match = re.search(r"\(attempt\s+(\d+)/(\d+)\)", content)
+        attempt_match = _REVIEW_ATTEMPT_RE.search(content) if "(attempt" in content else None
         if attempt_match:
             # Store attempt count in shell_verify_attempts for now (reusing field)
             state["shell_verify_attempts"] = int(attempt_match.group(1))
@@ -139,21 +157,21 @@ def parse_prompt_engine_response(response: str | dict) -> ChainState | None:
     # Fallback: Detect legacy inline gates section
     elif "## Inline Gates" in content:
         # Extract gate names from legacy format
-        gate_names = re.findall(r"###\s*([A-Za-z][A-Za-z0-9 _-]+)\n", content)
+        gate_names = _INLINE_GATE_NAME_RE.findall(content)
         if gate_names:
             state["pending_gate"] = gate_names[0].strip()
 
-        # Extract gate criteria
-        criteria = re.findall(r"[-•]\s*(.+?)(?:\n|$)", content)
-        state["gate_criteria"] = [c.strip() for c in criteria[:5] if c.strip()]
+        # Extract gate criteria (first 5 bullets; stop scanning there)
+        criteria = (m.group(1).strip() for m in islice(_CRITERIA_RE.finditer(content), 5))
+        state["gate_criteria"] = [c for c in criteria if c]
 
     # Detect shell verification: "Shell verification: npm test"
-    verify_match = re.search(r"Shell verification:\s*(.+?)(?:\n|$)", content)
+    verify_match = _SHELL_VERIFY_RE.search(content) if "Shell verification:" in content else None
     if verify_match:
         state["pending_shell_verify"] = verify_match.group(1).strip()
 
     # Detect attempt count: "Attempt 2/5" or "(Attempt 2/5)"
-    attempt_match = re.search(r"Attempt\s+(\d+)/(\d+)", content)
+    attempt_match = _VERIFY_ATTEMPT_RE.search(content) if "Attempt" in content else None
     if attempt_match:
         state["shell_verify_attempts"] = int(attempt_match.group(1))
 
@@ -171,24 +189,27 @@ def format_chain_reminder(state: ChainState, mode: str = "full") -> str:
         state: Chain state to format
         mode: "full" for compact-recovery (multi-line), "inline" for prompt-suggest (two-line)
     """
-    chain_id = state.get("chain_id", "")
-    step = state["current_step"]
-    total = state["total_steps"]
+    step = state.get("current_step", 0)
     gate = state.get("pending_gate")
     verify_cmd = state.get("pending_shell_verify")
+    if not (step > 0 or gate or verify_cmd):
+        # Nothing active: both modes render empty
+        return ""
+
+    chain_id = state.get("chain_id", "")
+    total = state["total_steps"]
     verify_attempts = state.get("shell_verify_attempts", 1)
 
     if mode == "inline":
         # Two-line hybrid: Line 1 = status, Line 2 = action
         parts = []
         if step > 0:
-            chain_label = chain_id if chain_id else "active"
-            parts.append(f"[{chain_label}] {step}/{total}")
+            parts.append(f"[{chain_id or 'active'}] {step}/{total}")
         if gate:
             parts.append(f"Gate: {gate}")
         if verify_cmd:
             parts.append(f"Verify: {verify_attempts}/5")
-        line1 = " | ".join(parts) if parts else ""
+        line1 = " | ".join(parts)
 
         # Line 2: Clear continuation instruction
         if verify_cmd:
@@ -200,7 +221,7 @@ def format_chain_reminder(state: ChainState, mode: str = "full") -> str:
         else:
             line2 = ""
 
-        return f"{line1}\n{line2}".strip() if line1 else ""
+        return f"{line1}\n{line2}" if line2 else line1
 
     # Full format for compact-recovery SessionStart hook (preserves context across compaction)
     lines = []
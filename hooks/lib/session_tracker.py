@@ -6,15 +6,29 @@ Captures:
 - Git-style file change summary
 - Context for spawned CLI instances
 
+Persistence: changes are buffered in memory and written by flush() (at each
+record_iteration, before building spawn context, and at process exit) as
+JSON lines appended to {session_id}.events.jsonl; the full {session_id}.json
+snapshot is rewritten only every _SNAPSHOT_EVERY events, so a long session no
+longer rewrites its whole history per change. Loading replays the log on top
+of the snapshot.
+
 Uses workspace resolution from workspace.py.
 """
 
+import atexit
 import json
+import os
+import re
+from collections import defaultdict
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 from typing import TypedDict
 
-from workspace import get_runtime_state_dir
+from json_codec import dumps as json_dumps
+from json_codec import loads as json_loads
+from workspace import ensure_dir, get_runtime_state_dir
 
 
 class IterationRecord(TypedDict):
@@ -31,6 +45,7 @@ class IterationRecord(TypedDict):
 class FileChange(TypedDict):
     """Record of a file change."""
 
+    file_path: str
     type: str  # "add", "remove", "modify"
     details: str  # "line 23: const encoded = ..."
     iteration: int
@@ -44,16 +59,30 @@ class RalphSessionState(TypedDict):
     verification_command: str
     working_directory: str
     iterations: list[IterationRecord]
-    file_changes: dict[str, list[FileChange]]
+    file_changes_log: list[FileChange]  # Append-only, chronological (see changes_by_file)
     created_at: str
     updated_at: str
+    event_seq: int  # Sequence number of the last event folded into this snapshot
+
+
+# Events appended between full snapshot rewrites
+_SNAPSHOT_EVERY = 25
+
+# History caps: a long loop keeps the opening iterations (original approach)
+# plus the most recent ones, and the latest changes per file
+_MAX_ITERATIONS = 50
+_KEEP_FIRST_ITERATIONS = 2
+_MAX_CHANGES_PER_FILE = 20
+
+# Absolute paths inside a verification command ("pytest /repo/tests/test_x.py")
+_COMMAND_PATH_RE = re.compile(r"/[^\s]+")
 
 
 def _get_ralph_sessions_dir() -> Path:
-    """Get Ralph sessions directory using workspace resolution."""
+    """Get Ralph sessions directory using workspace resolution (created on first use)."""
     dev_fallback = Path(__file__).parent.parent.parent / "server" / "runtime-state"
     runtime_dir = get_runtime_state_dir(dev_fallback)
-    return runtime_dir / "ralph-sessions"
+    return ensure_dir(runtime_dir / "ralph-sessions")
 
 
 class SessionTracker:
@@ -63,103 +92,208 @@ class SessionTracker:
         self.session_id = session_id
         self.sessions_dir = _get_ralph_sessions_dir()
         self.state_file = self.sessions_dir / f"{session_id}.json"
+        self.events_file = self.sessions_dir / f"{session_id}.events.jsonl"
+        self._has_snapshot = False
+        self._pending_events = 0  # Events in the log not yet folded into the snapshot
+        self._buffered: list[dict] = []  # Applied in memory, not yet written (dirty)
         self.state = self._load_or_create()
+        # Iteration numbers keep counting after older records are capped away
+        iterations = self.state["iterations"]
+        self._iter_count = iterations[-1]["number"] if iterations else 0
+        self._story_cache: str | None = None  # Rendered story; reset by goal/iteration events
 
     def _load_or_create(self) -> RalphSessionState:
-        """Load existing state or create new."""
-        self.sessions_dir.mkdir(parents=True, exist_ok=True)
-
+        """Load the snapshot (or create new state), then replay the event log on top."""
+        state: RalphSessionState | None = None
         if self.state_file.exists():
             try:
-                with open(self.state_file) as f:
-                    return json.load(f)
-            except (OSError, json.JSONDecodeError):
+                state = json_loads(self.state_file.read_bytes())
+                self._has_snapshot = True
+            except (OSError, json.JSONDecodeError, UnicodeDecodeError):
                 pass
+            else:
+                _migrate_file_changes(state)
+
+        if state is None:
+            now = datetime.now().isoformat()
+            state = {
+                "session_id": self.session_id,
+                "original_goal": "",
+                "verification_command": "",
+                "working_directory": "",
+                "iterations": [],
+                "file_changes_log": [],
+                "created_at": now,
+                "updated_at": now,
+                "event_seq": 0,
+            }
+
+        self._replay_events(state)
+        return state
+
+    def _replay_events(self, state: RalphSessionState) -> None:
+        """Apply logged events newer than the snapshot; stop at a torn final line."""
+        try:
+            log = self.events_file.read_bytes()
+        except OSError:
+            return
+        snapshot_seq = state.get("event_seq", 0)
+        for line in log.split(b"\n"):
+            if not line:
+                continue
+            try:
+                event = json_loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                break
+            self._pending_events += 1
+            # Already folded in if a crash hit between snapshot write and log removal
+            if event["seq"] > snapshot_seq:
+                _apply_event(state, event)
+
+    def _record(self, event: dict, now: str | None = None) -> None:
+        """Apply an event in memory and buffer it until the next flush().
+
+        now is the event time (ISO string); callers that already stamped the
+        event pass it to avoid a second clock read.
+        """
+        event["seq"] = self.state.get("event_seq", 0) + 1
+        event["at"] = now or datetime.now().isoformat()
+        _apply_event(self.state, event)
+        if event["type"] != "file_change":
+            self._story_cache = None
+
+        if not self._buffered:
+            # Safety net for callers that exit without flushing
+            atexit.register(self.flush)
+        self._buffered.append(event)
+
+    def flush(self) -> None:
+        """Write buffered events with one log append (or a snapshot when due)."""
+        if not self._buffered:
+            return
+        if not self._has_snapshot or self._pending_events + len(self._buffered) >= _SNAPSHOT_EVERY:
+            # First write creates the snapshot (keeps created_at); later ones compact the log
+            self.flush_snapshot()
+            return
+
+        events = self._buffered
+        self._buffered = []
+        atexit.unregister(self.flush)
+        try:
+            with open(self.events_file, "ab") as f:
+                f.write(b"".join(json_dumps(event) + b"\n" for event in events))
+            self._pending_events += len(events)
+        except OSError:
+            pass
+
+    def flush_snapshot(self) -> None:
+        """Write the full state snapshot and drop the events it now contains.
 
-        # Create new state
-        return {
-            "session_id": self.session_id,
-            "original_goal": "",
-            "verification_command": "",
-            "working_directory": "",
-            "iterations": [],
-            "file_changes": {},
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
-        }
-
-    def _save(self) -> None:
-        """Persist state to disk."""
-        self.state["updated_at"] = datetime.now().isoformat()
+        Written to a temp file and swapped in with os.replace, so a crash
+        mid-write leaves the previous snapshot intact.
+        """
+        if self._buffered:
+            self._buffered = []
+            atexit.unregister(self.flush)
+
+        # Compact: only the next hook reads this file
+        payload = json_dumps(self.state)
         try:
-            with open(self.state_file, "w") as f:
-                json.dump(self.state, f, indent=2)
+            tmp = self.state_file.with_suffix(".json.tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, self.state_file)
+            self._has_snapshot = True
+            self.events_file.unlink(missing_ok=True)
+            self._pending_events = 0
         except OSError:
             pass
 
     def set_goal(self, goal: str, verification_command: str, working_directory: str = "") -> None:
         """Set the original goal for this session."""
-        self.state["original_goal"] = goal
-        self.state["verification_command"] = verification_command
-        self.state["working_directory"] = working_directory
-        self._save()
+        self._record(
+            {
+                "type": "goal",
+                "original_goal": goal,
+                "verification_command": verification_command,
+                "working_directory": working_directory,
+            }
+        )
 
     def record_iteration(self, approach: str, result: str, lesson: str, files_changed: list[str] | None = None) -> None:
-        """Record what was tried and what was learned."""
-        iteration_num = len(self.state["iterations"]) + 1
-        self.state["iterations"].append(
+        """Record what was tried and what was learned.
+
+        Past _MAX_ITERATIONS, the first _KEEP_FIRST_ITERATIONS records and the
+        most recent ones are kept; iteration numbers continue regardless.
+        """
+        self._iter_count += 1
+        iteration_num = self._iter_count
+        now = datetime.now().isoformat()
+        self._record(
             {
-                "number": iteration_num,
-                "approach": approach,
-                "result": result,
-                "lesson": lesson,
-                "timestamp": datetime.now().isoformat(),
-                "files_changed": files_changed or [],
-            }
+                "type": "iteration",
+                "record": {
+                    "number": iteration_num,
+                    "approach": approach,
+                    "result": result,
+                    "lesson": lesson,
+                    "timestamp": now,
+                    "files_changed": files_changed or [],
+                },
+            },
+            now,
         )
-        self._save()
+        # Iteration boundary: persist it together with any buffered goal/file changes
+        self.flush()
 
     def record_file_change(self, file_path: str, change_type: str, details: str) -> None:
-        """Track git-style changes made during session."""
-        if file_path not in self.state["file_changes"]:
-            self.state["file_changes"][file_path] = []
-
-        current_iteration = len(self.state["iterations"]) + 1
-        self.state["file_changes"][file_path].append(
-            {"type": change_type, "details": details, "iteration": current_iteration}
+        """Track git-style changes made during session (latest _MAX_CHANGES_PER_FILE per file)."""
+        current_iteration = self._iter_count + 1
+        self._record(
+            {
+                "type": "file_change",
+                "path": file_path,
+                "change": {"type": change_type, "details": details, "iteration": current_iteration},
+            }
         )
-        self._save()
 
     def get_iteration_count(self) -> int:
         """Get current iteration count."""
-        return len(self.state["iterations"])
+        return self._iter_count
 
     def generate_story(self) -> str:
-        """Generate narrative 'session story' for spawned instance."""
+        """
+        Generate narrative 'session story' for spawned instance.
+
+        Always text, unlike generate_diff_summary: callers embed the story
+        directly, so an empty session gets a placeholder rather than None.
+        """
         if not self.state["iterations"]:
             return "No iterations recorded yet."
-
-        story_parts = [f"This task started with: {self.state['original_goal']}\n", "Here's what's been tried:\n"]
-
-        for it in self.state["iterations"]:
-            story_parts.append(
-                f"{it['number']}. **Iteration {it['number']}**: {it['approach']}\n"
-                f"   - Result: {it['result']}\n"
-                f"   - Lesson: {it['lesson']}"
+        if self._story_cache is None:
+            self._story_cache = "\n\n".join(
+                [
+                    f"This task started with: {self.state['original_goal']}\n",
+                    "Here's what's been tried:\n",
+                    *(_story_entry(it) for it in self.state["iterations"]),
+                ]
             )
-            if it.get("files_changed"):
-                story_parts.append(f"   - Files: {', '.join(it['files_changed'])}")
+        return self._story_cache
 
-        return "\n\n".join(story_parts)
+    def changes_by_file(self) -> dict[str, list[FileChange]]:
+        """Group the change log by path (paths in first-changed order)."""
+        grouped: defaultdict[str, list[FileChange]] = defaultdict(list)
+        for change in self.state["file_changes_log"]:
+            grouped[change["file_path"]].append(change)
+        return dict(grouped)
 
-    def generate_diff_summary(self) -> str:
-        """Generate git-style diff summary of all changes."""
-        if not self.state["file_changes"]:
-            return "No file changes recorded."
+    def generate_diff_summary(self) -> str | None:
+        """Generate git-style diff summary of all changes (None when nothing changed)."""
+        if not self.state["file_changes_log"]:
+            return None
 
         lines = ["```diff", "# Files modified this session:"]
 
-        for file_path, changes in self.state["file_changes"].items():
+        for file_path, changes in self.changes_by_file().items():
             lines.append(file_path)
             for change in changes:
                 prefix = {"add": "+", "remove": "-", "modify": "~"}.get(change["type"], "?")
@@ -171,19 +305,8 @@ class SessionTracker:
     def generate_what_to_try(self) -> str:
         """Generate suggestion for next iteration based on lessons learned."""
         # Extract directory hint from verification command
-        cmd = self.state.get("verification_command", "")
-        dir_hint = ""
-        if cmd:
-            import re
-
-            # Look for file paths in the command
-            paths = re.findall(r"(/[^\s]+)", cmd)
-            if paths:
-                from pathlib import Path
-
-                test_path = Path(paths[0])
-                if test_path.parent.exists():
-                    dir_hint = f"\n- Look in `{test_path.parent}/` for source files to fix"
+        command_dir = command_directory(self.state.get("verification_command", ""))
+        dir_hint = f"\n- Look in `{command_dir}/` for source files to fix" if command_dir else ""
 
         if not self.state["iterations"]:
             return f"Start by reading files in the test directory to find the bug.{dir_hint}"
@@ -206,6 +329,10 @@ class SessionTracker:
 
     def generate_task_context(self, last_failure_output: str = "") -> str:
         """Generate complete task context for spawned CLI instance."""
+        # A spawn is a natural checkpoint: compact the log before handing off
+        if self._pending_events or self._buffered:
+            self.flush_snapshot()
+
         sections = []
 
         # Original Goal
@@ -215,18 +342,18 @@ class SessionTracker:
         sections.append(f"## Session Story\n\n{self.generate_story()}")
 
         # Git-Style Change Summary
-        if self.state["file_changes"]:
-            sections.append(f"## Git-Style Change Summary\n\n{self.generate_diff_summary()}")
+        diff_summary = self.generate_diff_summary()
+        if diff_summary is not None:
+            sections.append(f"## Git-Style Change Summary\n\n{diff_summary}")
 
         # Current State
-        changed_files = list(self.state["file_changes"].keys())
-        if changed_files:
-            files_list = "\n".join(f"- `{f}` ({len(self.state['file_changes'][f])} changes)" for f in changed_files[:5])
+        if self.state["file_changes_log"]:
+            files_list = format_changed_files(self.changes_by_file())
             sections.append(f"## Current State\n\nFiles to focus on:\n{files_list}")
 
         # Last Failure
         if last_failure_output:
-            iteration_num = len(self.state["iterations"])
+            iteration_num = self._iter_count
             sections.append(f"## Last Failure (Iteration {iteration_num})\n\n```\n{last_failure_output[:2000]}\n```")
 
         # What To Try Next
@@ -247,8 +374,74 @@ class SessionTracker:
 
     def clear(self) -> None:
         """Clear session state (call on successful verification)."""
+        if self._buffered:
+            self._buffered = []
+            atexit.unregister(self.flush)
         if self.state_file.exists():
             self.state_file.unlink()
+        self.events_file.unlink(missing_ok=True)
+
+
+def _story_entry(it: IterationRecord) -> str:
+    """One numbered session-story entry (files line included when present)."""
+    entry = (
+        f"{it['number']}. **Iteration {it['number']}**: {it['approach']}\n"
+        f"   - Result: {it['result']}\n"
+        f"   - Lesson: {it['lesson']}"
+    )
+    if it.get("files_changed"):
+        entry += f"\n\n   - Files: {', '.join(it['files_changed'])}"
+    return entry
+
+
+def format_changed_files(file_changes: dict[str, list[FileChange]], limit: int = 5) -> str:
+    """Bullet list of the first `limit` changed files with their change counts."""
+    return "\n".join(f"- `{path}` ({len(changes)} changes)" for path, changes in islice(file_changes.items(), limit))
+
+
+def command_directory(command: str) -> Path | None:
+    """Existing parent directory of the first absolute path in a command, if any."""
+    match = _COMMAND_PATH_RE.search(command) if "/" in command else None
+    if match:
+        parent = Path(match.group()).parent
+        if parent.exists():
+            return parent
+    return None
+
+
+def _migrate_file_changes(state: dict) -> None:
+    """Convert a pre-log snapshot's {path: [changes]} mapping into file_changes_log."""
+    legacy = state.pop("file_changes", None)
+    if legacy is None:
+        return
+    log = [{"file_path": path, **change} for path, changes in legacy.items() for change in changes]
+    # Stable sort restores iteration order; within an iteration, grouping order is kept
+    log.sort(key=lambda change: change.get("iteration", 0))
+    state["file_changes_log"] = log
+
+
+def _apply_event(state: RalphSessionState, event: dict) -> None:
+    """Fold one logged event into state."""
+    kind = event["type"]
+    if kind == "goal":
+        state["original_goal"] = event["original_goal"]
+        state["verification_command"] = event["verification_command"]
+        state["working_directory"] = event["working_directory"]
+    elif kind == "iteration":
+        iterations = state["iterations"]
+        iterations.append(event["record"])
+        if len(iterations) > _MAX_ITERATIONS:
+            del iterations[_KEEP_FIRST_ITERATIONS : len(iterations) - (_MAX_ITERATIONS - _KEEP_FIRST_ITERATIONS)]
+    elif kind == "file_change":
+        log = state["file_changes_log"]
+        path = event["path"]
+        log.append({"file_path": path, **event["change"]})
+        if len(log) > _MAX_CHANGES_PER_FILE:
+            positions = [i for i, change in enumerate(log) if change["file_path"] == path]
+            if len(positions) > _MAX_CHANGES_PER_FILE:
+                del log[positions[0]]
+    state["event_seq"] = event["seq"]
+    state["updated_at"] = event["at"]
 
 
 def get_session_tracker(session_id: str) -> SessionTracker:
@@ -263,7 +456,7 @@ def clear_ralph_session(session_id: str) -> None:
 
 
 def cleanup_old_ralph_sessions(max_age_hours: int = 24) -> int:
-    """Delete ralph-sessions JSON files older than max_age. Returns count deleted."""
+    """Delete ralph-sessions snapshot, event-log and stray temp files older than max_age. Returns count deleted."""
     import time
 
     sessions_dir = _get_ralph_sessions_dir()
@@ -271,11 +464,16 @@ def cleanup_old_ralph_sessions(max_age_hours: int = 24) -> int:
         return 0
     cutoff = time.time() - (max_age_hours * 3600)
     count = 0
-    for f in sessions_dir.glob("*.json"):
-        try:
-            if f.stat().st_mtime < cutoff:
-                f.unlink()
-                count += 1
-        except OSError:
-            pass
+    # scandir hands back DirEntry objects whose stat() result is cached on the
+    # entry, so each file costs one stat instead of glob's match + Path.stat().
+    with os.scandir(sessions_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.name.endswith((".json", ".jsonl", ".json.tmp")):
+                continue
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    count += 1
+            except OSError:
+                pass
     return count
@@ -5,12 +5,16 @@ Defines the markdown format for task files that communicate between
 the orchestrating Claude Code instance and spawned CLI instances.
 
 Task files contain:
-- YAML frontmatter with metadata
+- Frontmatter with metadata (JSON, which is also valid YAML; hand-written
+  YAML frontmatter still parses)
 - Session story and context
 - Instructions for the spawned instance
 """
 
+import json
+import os
 import re
+import time
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -18,8 +22,21 @@ from pathlib import Path
 from typing import Literal
 
 import yaml
-from session_tracker import SessionTracker
-from workspace import get_runtime_state_dir
+from json_codec import dumps as json_dumps
+from json_codec import loads as json_loads
+from session_tracker import SessionTracker, format_changed_files
+from workspace import ensure_dir, get_runtime_state_dir
+
+# YAML frontmatter (hand-edited or older task files): prefer the LibYAML (C) loader
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
+_FRONTMATTER_RE = re.compile(r"^---\n(.+?)\n---", re.DOTALL)
+# One pass over the body: each "## Heading" up to the next heading or end of file
+_SECTION_RE = re.compile(r"^## ([^\n]+)\n\n(.*?)(?=\n## |\Z)", re.DOTALL | re.MULTILINE)
+_LAST_FAILURE_HEADING_RE = re.compile(r"Last Failure(?: \(Iteration \d+\))?")
 
 
 @dataclass
@@ -43,7 +60,7 @@ class TaskFile:
 
     metadata: TaskMetadata
     session_story: str
-    diff_summary: str
+    diff_summary: str | None  # None when no files changed (section omitted)
     current_state: str
     last_failure: str
     what_to_try: str
@@ -72,12 +89,10 @@ class ResultFile:
 
 
 def _get_tasks_dir() -> Path:
-    """Get Ralph tasks directory."""
+    """Get Ralph tasks directory (created on first use)."""
     dev_fallback = Path(__file__).parent.parent.parent / "server" / "runtime-state"
     runtime_dir = get_runtime_state_dir(dev_fallback)
-    tasks_dir = runtime_dir / "ralph-tasks"
-    tasks_dir.mkdir(parents=True, exist_ok=True)
-    return tasks_dir
+    return ensure_dir(runtime_dir / "ralph-tasks")
 
 
 def generate_task_id() -> str:
@@ -121,9 +136,8 @@ def create_task_file(
     what_to_try = tracker.generate_what_to_try()
 
     # Build current state section
-    changed_files = list(tracker.state.get("file_changes", {}).keys())
-    if changed_files:
-        files_list = "\n".join(f"- `{f}` ({len(tracker.state['file_changes'][f])} changes)" for f in changed_files[:5])
+    if tracker.state["file_changes_log"]:
+        files_list = format_changed_files(tracker.changes_by_file())
         current_state = f"Files to focus on:\n{files_list}"
     else:
         current_state = "No files modified yet."
@@ -164,7 +178,6 @@ IMPORTANT: You must actually EDIT the files, not just describe the fix. Use your
 
 def render_task_file(task: TaskFile) -> str:
     """Render a TaskFile to markdown string."""
-    # Build YAML frontmatter
     frontmatter = {
         "id": task.metadata.id,
         "created": task.metadata.created,
@@ -177,13 +190,13 @@ def render_task_file(task: TaskFile) -> str:
     }
 
     sections = [
-        f"---\n{yaml.dump(frontmatter, default_flow_style=False)}---",
+        f"---\n{_dump_frontmatter(frontmatter)}\n---",
         f"## Original Goal\n\n{task.metadata.original_request}",
         f"## Session Story\n\n{task.session_story}",
     ]
 
     # Only include diff summary if there are changes
-    if task.diff_summary and "No file changes" not in task.diff_summary:
+    if task.diff_summary:
         sections.append(f"## Git-Style Change Summary\n\n{task.diff_summary}")
 
     sections.extend(
@@ -198,16 +211,41 @@ def render_task_file(task: TaskFile) -> str:
     return "\n\n".join(sections)
 
 
+def _dump_frontmatter(frontmatter: dict) -> str:
+    """Serialize frontmatter as indented JSON (a YAML subset, so YAML tools still read it)."""
+    return json_dumps(frontmatter, indent=True).decode("utf-8")
+
+
+def _load_frontmatter(text: str) -> dict | None:
+    """Parse JSON frontmatter, falling back to YAML; None when neither parses."""
+    if text.startswith("{"):
+        try:
+            return json_loads(text)
+        except json.JSONDecodeError:
+            pass
+    try:
+        return yaml.load(text, Loader=_YamlLoader)
+    except yaml.YAMLError:
+        return None
+
+
+def _split_sections(body: str) -> dict[str, str]:
+    """Map each "## Heading" in body to its stripped text (first occurrence wins)."""
+    sections: dict[str, str] = {}
+    for match in _SECTION_RE.finditer(body):
+        sections.setdefault(match.group(1).strip(), match.group(2).strip())
+    return sections
+
+
 def parse_task_file(content: str) -> TaskFile | None:
     """Parse a task file from markdown string."""
     # Extract frontmatter
-    frontmatter_match = re.match(r"^---\n(.+?)\n---", content, re.DOTALL)
+    frontmatter_match = _FRONTMATTER_RE.match(content)
     if not frontmatter_match:
         return None
 
-    try:
-        frontmatter = yaml.safe_load(frontmatter_match.group(1))
-    except yaml.YAMLError:
+    frontmatter = _load_frontmatter(frontmatter_match.group(1))
+    if frontmatter is None:
         return None
 
     metadata = TaskMetadata(
@@ -222,22 +260,20 @@ def parse_task_file(content: str) -> TaskFile | None:
         max_budget_usd=frontmatter.get("max_budget_usd", 1.00),
     )
 
-    # Extract sections (simplified parsing)
     body = content[frontmatter_match.end() :]
 
-    def extract_section(name: str) -> str:
-        pattern = rf"## {name}\n\n(.+?)(?=\n## |\Z)"
-        match = re.search(pattern, body, re.DOTALL)
-        return match.group(1).strip() if match else ""
+    sections = _split_sections(body)
 
     return TaskFile(
         metadata=metadata,
-        session_story=extract_section("Session Story"),
-        diff_summary=extract_section("Git-Style Change Summary"),
-        current_state=extract_section("Current State"),
-        last_failure=extract_section(r"Last Failure \(Iteration \d+\)") or extract_section("Last Failure"),
-        what_to_try=extract_section("What To Try Next"),
-        instructions=extract_section("Instructions"),
+        session_story=sections.get("Session Story", ""),
+        diff_summary=sections.get("Git-Style Change Summary"),
+        current_state=sections.get("Current State", ""),
+        last_failure=next(
+            (text for heading, text in sections.items() if _LAST_FAILURE_HEADING_RE.fullmatch(heading)), ""
+        ),
+        what_to_try=sections.get("What To Try Next", ""),
+        instructions=sections.get("Instructions", ""),
     )
 
 
@@ -280,7 +316,7 @@ def render_result_file(result: ResultFile) -> str:
     }
 
     sections = [
-        f"---\n{yaml.dump(frontmatter, default_flow_style=False)}---",
+        f"---\n{_dump_frontmatter(frontmatter)}\n---",
         f"## Summary\n\n{result.summary}",
     ]
 
@@ -300,13 +336,12 @@ def render_result_file(result: ResultFile) -> str:
 def parse_result_file(content: str) -> ResultFile | None:
     """Parse a result file from markdown string."""
     # Extract frontmatter
-    frontmatter_match = re.match(r"^---\n(.+?)\n---", content, re.DOTALL)
+    frontmatter_match = _FRONTMATTER_RE.match(content)
     if not frontmatter_match:
         return None
 
-    try:
-        frontmatter = yaml.safe_load(frontmatter_match.group(1))
-    except yaml.YAMLError:
+    frontmatter = _load_frontmatter(frontmatter_match.group(1))
+    if frontmatter is None:
         return None
 
     metadata = ResultMetadata(
@@ -318,13 +353,10 @@ def parse_result_file(content: str) -> ResultFile | None:
 
     body = content[frontmatter_match.end() :]
 
-    def extract_section(name: str) -> str:
-        pattern = rf"## {name}\n\n(.+?)(?=\n## |\Z)"
-        match = re.search(pattern, body, re.DOTALL)
-        return match.group(1).strip() if match else ""
+    sections = _split_sections(body)
 
     # Parse changes_made as list
-    changes_section = extract_section("Changes Made")
+    changes_section = sections.get("Changes Made", "")
     changes_made = []
     if changes_section:
         for line in changes_section.split("\n"):
@@ -333,50 +365,59 @@ def parse_result_file(content: str) -> ResultFile | None:
                 changes_made.append(line[2:])
 
     # Extract verification output from code block
-    verification_output = extract_section("Verification Output")
+    verification_output = sections.get("Verification Output", "")
     if verification_output.startswith("```"):
         verification_output = verification_output.strip("`").strip()
 
     return ResultFile(
         metadata=metadata,
-        summary=extract_section("Summary"),
+        summary=sections.get("Summary", ""),
         changes_made=changes_made,
         verification_output=verification_output,
-        lesson_learned=extract_section("Lesson Learned"),
+        lesson_learned=sections.get("Lesson Learned", ""),
     )
 
 
+def _scan_task_entries(tasks_dir: Path) -> dict[str, os.DirEntry]:
+    """List task-*.md files (tasks and results) by name in one directory pass."""
+    with os.scandir(tasks_dir) as entries:
+        return {e.name: e for e in entries if e.name.startswith("task-") and e.name.endswith(".md")}
+
+
+def _result_name(task_name: str) -> str:
+    return f"{task_name[:-3]}-result.md"
+
+
 def get_pending_tasks() -> list[Path]:
-    """Get list of pending (unprocessed) task files."""
+    """Get list of pending (unprocessed) task files, oldest first."""
     tasks_dir = _get_tasks_dir()
-    task_files = list(tasks_dir.glob("task-*.md"))
-
-    # Filter out those that have result files
-    pending = []
-    for tf in task_files:
-        result_file = tf.parent / f"{tf.stem}-result.md"
-        if not result_file.exists():
-            pending.append(tf)
+    entries = _scan_task_entries(tasks_dir)
 
-    return sorted(pending, key=lambda p: p.stat().st_mtime)
+    # DirEntry caches its stat result, so sorting costs no extra syscalls
+    pending = [
+        e for name, e in entries.items() if not name.endswith("-result.md") and _result_name(name) not in entries
+    ]
+    pending.sort(key=lambda e: e.stat().st_mtime)
+    return [Path(e.path) for e in pending]
 
 
 def cleanup_old_tasks(max_age_hours: int = 24) -> int:
-    """Remove task files older than max_age_hours."""
+    """Remove task files older than max_age_hours, along with their result files."""
     tasks_dir = _get_tasks_dir()
-    now = datetime.now()
-    removed = 0
-
-    for f in tasks_dir.glob("task-*.md"):
-        age = now.timestamp() - f.stat().st_mtime
-        if age > max_age_hours * 3600:
-            f.unlink()
-            removed += 1
+    cutoff = time.time() - max_age_hours * 3600
+    entries = _scan_task_entries(tasks_dir)
 
-            # Also remove corresponding result file
-            result_file = f.parent / f"{f.stem}-result.md"
-            if result_file.exists():
-                result_file.unlink()
-                removed += 1
+    stale = {name for name, e in entries.items() if e.stat().st_mtime < cutoff}
+    # A stale task takes its result file with it, however recent
+    stale.update(
+        _result_name(name) for name in list(stale) if not name.endswith("-result.md") and _result_name(name) in entries
+    )
 
+    removed = 0
+    for name in stale:
+        try:
+            os.unlink(entries[name].path)
+            removed += 1
+        except FileNotFoundError:
+            pass
     return removed
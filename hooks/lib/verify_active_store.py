@@ -11,7 +11,7 @@ import time
 from pathlib import Path
 from typing import Any
 
-from workspace import get_runtime_state_dir
+from workspace import ensure_dir, get_runtime_state_dir
 
 LOCK_RETRIES = 80
 LOCK_RETRY_DELAY_SECONDS = 0.025
@@ -21,8 +21,7 @@ STALE_LOCK_SECONDS = 30
 def get_verify_state_db_path() -> Path:
     """Get path to verify-state.db in runtime-state."""
     dev_fallback = Path(__file__).parent.parent.parent / "runtime-state"
-    runtime_dir = get_runtime_state_dir(dev_fallback)
-    runtime_dir.mkdir(parents=True, exist_ok=True)
+    runtime_dir = ensure_dir(get_runtime_state_dir(dev_fallback))
     return runtime_dir / "verify-state.db"
 
 
@@ -13,6 +13,9 @@ Priority:
 import os
 from pathlib import Path
 
+# Directories already created by this process (see ensure_dir)
+_ensured_dirs: set[Path] = set()
+
 
 def get_workspace_root() -> Path | None:
     """
@@ -100,6 +103,18 @@ def get_runtime_state_dir(fallback: Path) -> Path:
     return fallback
 
 
+def ensure_dir(path: Path) -> Path:
+    """Create path (and parents) once per process; later calls skip the mkdir syscall.
+
+    Keyed by path rather than cached per caller: the workspace, and so the
+    directory, can change between calls.
+    """
+    if path not in _ensured_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(path)
+    return path
+
+
 def get_state_db_path() -> Path | None:
     """Get path to the MCP server's state.db (read-only from hooks)."""
     workspace = get_workspace_root()
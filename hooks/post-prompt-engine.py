@@ -11,34 +11,47 @@ Parses the response to:
 """
 
 import json
+import os
 import sys
-from pathlib import Path
 
 # Add hooks lib to path
-sys.path.insert(0, str(Path(__file__).parent / "lib"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "lib"))
 
+from json_codec import loads, read_stdin_bytes, write_stdout
 from session_state import (
     parse_prompt_engine_response,
     save_session_state,
 )
 
 
-def parse_hook_input() -> dict:
+def emit_directive(directive: str) -> None:
+    """Print the hook response carrying a Claude-facing directive."""
+    write_stdout({"hookSpecificOutput": {"hookEventName": "PostToolUse", "additionalContext": directive}})
+
+
+def parse_hook_input(raw: bytes) -> dict:
     """Parse JSON input from Claude Code hook system."""
     try:
-        return json.load(sys.stdin)
+        return loads(raw)
     except json.JSONDecodeError:
         return {}
 
 
 def main():
-    hook_input = parse_hook_input()
+    raw_input = read_stdin_bytes()
+
+    # Cheap prefilter: skip decoding (potentially large) tool payloads that
+    # cannot be a prompt_engine call
+    if b"prompt_engine" not in raw_input:
+        sys.exit(0)
+
+    hook_input = parse_hook_input(raw_input)
 
     tool_name = hook_input.get("tool_name", "")
     session_id = hook_input.get("session_id", "")
 
     # Only process prompt_engine calls
-    if "prompt_engine" not in tool_name:
+    if not tool_name.endswith("prompt_engine"):
         sys.exit(0)
 
     tool_response = hook_input.get("tool_response", {})
@@ -49,7 +62,9 @@ def main():
         content = tool_response.get("content", "")
         # Handle array of content blocks
         if isinstance(content, list):
-            content = " ".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+            # List (not generator): str.join materializes its input anyway.
+            # Blocks are decoded JSON, so an exact type check suffices.
+            content = " ".join([block.get("text", "") if type(block) is dict else str(block) for block in content])
     else:
         content = str(tool_response)
 
@@ -83,8 +98,7 @@ def main():
         # User sees server's "Gate Review Required" message in tool response
         directive = f'<GATE-REVIEW>chain_id="{chain_id}" gates="{pending_gate}" → Submit gate_verdict</GATE-REVIEW>'
 
-        hook_response = {"hookSpecificOutput": {"hookEventName": "PostToolUse", "additionalContext": directive}}
-        print(json.dumps(hook_response))
+        emit_directive(directive)
         sys.exit(0)
 
     # Imperative directive: force Claude to continue chain
@@ -96,8 +110,7 @@ def main():
             f"Do not respond without advancing.\n"
             f"</CALL-TOOL>"
         )
-        hook_response = {"hookSpecificOutput": {"hookEventName": "PostToolUse", "additionalContext": directive}}
-        print(json.dumps(hook_response))
+        emit_directive(directive)
         sys.exit(0)
 
     sys.exit(0)  # No output needed
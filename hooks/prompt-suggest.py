@@ -14,13 +14,14 @@ Operators detected (from SSOT registry):
 - `-->` chain, `==>` delegation, `::` gate, `@` framework, `#` style, `* N` repetition
 """
 
+import functools
 import json
+import os
 import re
 import sys
-from pathlib import Path
 
 # Add hooks lib to path
-sys.path.insert(0, str(Path(__file__).parent / "lib"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "lib"))
 
 from cache_manager import (
     ArgumentInfo,
@@ -35,6 +36,7 @@ from cache_manager import (
 )
 from config_loader import is_expanded_output
 from db_reader import load_active_chain_state
+from json_codec import loads, read_stdin_bytes, write_stdout
 from session_state import ChainState, format_chain_reminder, load_session_state
 
 # Import generated operator patterns (SSOT: server/tooling/contracts/operators.json)
@@ -50,6 +52,27 @@ except ImportError:
         return ["-->", "==>"]
 
 
+# Patterns compiled once per hook process; the detectors run on every user message.
+_PROMPT_ID_RE = re.compile(r">>\s*([a-zA-Z0-9_-]+)")
+# SSOT delimiter symbols plus the → unicode alias
+_CHAIN_DELIMITERS = (*get_delimiter_symbols(), "→")
+_DELIMITER_ALT = "|".join([re.escape(d) for d in _CHAIN_DELIMITERS])
+# One token per delimiter (group 1) or >>prompt_id (group 2). The id stops short of a
+# delimiter so ">>a-->b" tokenizes the same as when split on the delimiter first.
+_CHAIN_TOKEN_RE = re.compile(rf"({_DELIMITER_ALT})|>>\s*((?:(?!{_DELIMITER_ALT})[a-zA-Z0-9_-])+)")
+# :: 'quoted criteria' (group 1) or :: gate-id (group 2)
+_GATE_RE = re.compile(r"""::\s*(?:['"]([^'"]+)['"]|([a-zA-Z][a-zA-Z0-9_-]*)\b)""")
+# Explicit suggestion requests ("suggest prompts", "prompt suggestions", ...) in one pass
+_EXPLICIT_REQUEST_RE = re.compile(
+    r"(?i)\b(?:(?:suggest|list|available|show|what|recommend)\s+prompts?|prompt\s+suggestions?)\b"
+)
+_INLINE_ARG_RE = re.compile(r'(\w+):["\']([^"\']+)["\']')
+# Fallbacks used only when the generated operator patterns are unavailable
+_FRAMEWORK_RE = re.compile(r"(?:^|\s)@([A-Za-z0-9_-]+)(?=\s|$)")
+_STYLE_RE = re.compile(r"(?:^|\s)#([A-Za-z][A-Za-z0-9_-]*)(?=\s|$)")
+_REPETITION_RE = re.compile(r"\s+\*\s*(\d+)(?=\s|$|-->)")
+
+
 def format_arguments(prompt_id: str) -> dict[str, str]:
     """
     Extract argument info from prompt metadata.
@@ -77,10 +100,20 @@ def format_arguments(prompt_id: str) -> dict[str, str]:
     return result
 
 
+def emit_response(system_message: str, additional_context: str) -> None:
+    """Print the hook response: compact user message plus context for Claude."""
+    write_stdout(
+        {
+            "systemMessage": system_message,
+            "hookSpecificOutput": {"hookEventName": "UserPromptSubmit", "additionalContext": additional_context},
+        }
+    )
+
+
 def parse_hook_input() -> dict:
     """Parse JSON input from Claude Code hook system."""
     try:
-        return json.load(sys.stdin)
+        return loads(read_stdin_bytes())
     except json.JSONDecodeError:
         return {}
 
@@ -97,14 +130,11 @@ def detect_prompt_invocation(message: str) -> str | None:
         @CAGEERF >>analyze -> "analyze"
         #analytical >>report -> "report"
     """
-    # Try exact start first
-    match = re.match(r"^>>\s*([a-zA-Z0-9_-]+)", message.strip())
-    if match:
-        # Normalize to lowercase for case-insensitive matching (aligns with MCP server)
-        return match.group(1).lower()
+    if ">>" not in message:
+        return None
 
-    # Also check for >> after operators (@framework, #style)
-    match = re.search(r">>\s*([a-zA-Z0-9_-]+)", message)
+    # First >> wins: covers both a leading invocation and one after operators (@framework, #style)
+    match = _PROMPT_ID_RE.search(message)
     if match:
         # Normalize to lowercase for case-insensitive matching (aligns with MCP server)
         return match.group(1).lower()
@@ -114,17 +144,7 @@ def detect_prompt_invocation(message: str) -> str | None:
 
 def detect_explicit_request(message: str) -> bool:
     """Detect explicit prompt suggestion requests."""
-    triggers = [
-        r"\bsuggest\s+prompts?\b",
-        r"\blist\s+prompts?\b",
-        r"\bavailable\s+prompts?\b",
-        r"\bshow\s+prompts?\b",
-        r"\bwhat\s+prompts?\b",
-        r"\bprompt\s+suggestions?\b",
-        r"\brecommend\s+prompts?\b",
-    ]
-    message_lower = message.lower()
-    return any(re.search(trigger, message_lower) for trigger in triggers)
+    return _EXPLICIT_REQUEST_RE.search(message) is not None
 
 
 def detect_chain_syntax(message: str) -> list[str]:
@@ -132,31 +152,32 @@ def detect_chain_syntax(message: str) -> list[str]:
     Detect chain syntax (-->, ==>) in message.
     Returns list of prompt IDs in chain order (normalized to lowercase).
 
-    Splits on delimiter operators from SSOT registry (plus → unicode alias),
-    then extracts >>prompt_id from each segment. Handles arguments between
-    prompt ID and delimiter correctly.
+    Single scan over delimiter operators from SSOT registry (plus → unicode
+    alias) and >>prompt_id tokens, keeping the first prompt ID of each
+    delimiter-separated segment. Handles arguments between prompt ID and
+    delimiter correctly.
 
     Example: >>analyze --> >>implement --> >>test
     Example with args: >>analyze scope:"backend" --> >>implement
     Example with delegation: >>step1 ==> >>step2
     """
-    # Build split pattern from SSOT delimiter symbols
-    delimiters = get_delimiter_symbols()
-    escaped = [re.escape(d) for d in delimiters] + ["→"]
-    split_pattern = r"\s*(?:" + "|".join(escaped) + r")\s*"
-
-    parts = re.split(split_pattern, message)
-    if len(parts) <= 1:
+    # Plain substring checks settle the common no-chain message without the regex
+    if ">>" not in message or not any(d in message for d in _CHAIN_DELIMITERS):
         return []
 
-    # Extract >>prompt_id from each segment (ignores arguments safely)
     prompts = []
-    for part in parts:
-        match = re.search(r">>\s*([a-zA-Z0-9_-]+)", part)
-        if match:
-            prompts.append(match.group(1).lower())
+    has_delimiter = False
+    segment_has_prompt = False
+    for match in _CHAIN_TOKEN_RE.finditer(message):
+        if match.group(1):
+            has_delimiter = True
+            segment_has_prompt = False
+        elif not segment_has_prompt:
+            # Later >>ids in the same segment are arguments, not chain steps
+            prompts.append(match.group(2).lower())
+            segment_has_prompt = True
 
-    return prompts
+    return prompts if has_delimiter else []
 
 
 def detect_inline_gates(message: str) -> list[str]:
@@ -171,14 +192,11 @@ def detect_inline_gates(message: str) -> list[str]:
     Note: Always uses semantic extraction (not generated patterns) because
     we need gate content, not the :: symbol itself.
     """
-    # Always use semantic patterns - generated pattern returns operator symbol too
-    quoted_pattern = r'::\s*[\'"]([^\'"]+)[\'"]'
-    id_pattern = r"::\s*([a-zA-Z][a-zA-Z0-9_-]*)\b"
-
-    quoted = re.findall(quoted_pattern, message)
-    ids = re.findall(id_pattern, message)
+    if "::" not in message:
+        return []
 
-    return quoted + ids
+    # Always use semantic patterns - generated pattern returns operator symbol too
+    return [match.group(1) or match.group(2) for match in _GATE_RE.finditer(message)]
 
 
 def detect_framework(message: str) -> str | None:
@@ -198,7 +216,7 @@ def detect_framework(message: str) -> str | None:
         return matches[0].lower() if matches else None
 
     # Fallback: hardcoded pattern
-    match = re.search(r"(?:^|\s)@([A-Za-z0-9_-]+)(?=\s|$)", message)
+    match = _FRAMEWORK_RE.search(message)
     return match.group(1).lower() if match else None
 
 
@@ -216,7 +234,7 @@ def detect_repetition(message: str) -> int | None:
         return int(matches[0]) if matches else None
 
     # Fallback: hardcoded pattern
-    match = re.search(r"\s+\*\s*(\d+)(?=\s|$|-->)", message)
+    match = _REPETITION_RE.search(message)
     return int(match.group(1)) if match else None
 
 
@@ -229,9 +247,7 @@ def parse_inline_args(message: str) -> dict[str, str]:
         >>prompt content:"hello world" -> {"content": "hello world"}
         >>prompt scope:'global' limit:"10" -> {"scope": "global", "limit": "10"}
     """
-    pattern = r'(\w+):["\']([^"\']+)["\']'
-    matches = re.findall(pattern, message)
-    return dict(matches)
+    return dict(_INLINE_ARG_RE.findall(message))
 
 
 def get_required_args(prompt_info: PromptInfo | None, parsed_args: dict[str, str]) -> list[str]:
@@ -287,18 +303,20 @@ def format_arg_signature(arg: ArgumentInfo, include_desc: bool = False) -> str:
     Returns:
         Compact format: name*:type or name*:type (description...)
     """
-    name = arg.get("name", "unknown")
-    arg_type = arg.get("type", "string")
-    required = arg.get("required", False)
+    desc = arg.get("description", "") if include_desc else ""
+    return _arg_signature(arg.get("name", "unknown"), arg.get("type", "string"), bool(arg.get("required", False)), desc)
+
+
+@functools.lru_cache(maxsize=512)
+def _arg_signature(name: str, arg_type: str, required: bool, desc: str) -> str:
+    """Memoized body of format_arg_signature; chain steps reuse the same argument shapes."""
     req_marker = "*" if required else ""
     base = f"{name}{req_marker}:{arg_type}"
 
-    if include_desc:
-        desc = arg.get("description", "")
-        if desc:
-            # Truncate long descriptions for token efficiency
-            short = desc[:50] + "..." if len(desc) > 50 else desc
-            return f"{base} ({short})"
+    if desc:
+        # Truncate long descriptions for token efficiency
+        short = desc[:50] + "..." if len(desc) > 50 else desc
+        return f"{base} ({short})"
     return base
 
 
@@ -429,7 +447,7 @@ def format_user_message(
     """
     # Extract prompt ID from command (handle @framework >>prompt syntax)
     # Normalize to lowercase for case-insensitive matching (aligns with MCP server)
-    match = re.search(r">>\s*([a-zA-Z0-9_-]+)", command)
+    match = _PROMPT_ID_RE.search(command)
     prompt_id = match.group(1).lower() if match else command.lower()
 
     if expanded:
@@ -660,7 +678,7 @@ def main():
                 if not valid_fws or framework.lower() in valid_fws:
                     operators["framework"] = [framework]
 
-            style_match = re.search(r"(?:^|\s)#([A-Za-z][A-Za-z0-9_-]*)(?=\s|$)", user_message)
+            style_match = _STYLE_RE.search(user_message)
             if style_match:
                 style = style_match.group(1)
                 valid_styles = get_valid_styles()
@@ -691,11 +709,7 @@ def main():
                 message = f"Unknown prompt '{invoked_prompt}'. No similar prompts found."
 
             # Return message WITHOUT directive (no tool call needed)
-            hook_response = {
-                "systemMessage": message,
-                "hookSpecificOutput": {"hookEventName": "UserPromptSubmit", "additionalContext": message},
-            }
-            print(json.dumps(hook_response))
+            emit_response(message, message)
             sys.exit(0)
 
         # Get required args that are missing
@@ -714,14 +728,8 @@ def main():
         system_message = format_user_message(command, parsed_args, operators, arguments, expanded, prompt_info)
         directive = format_directive(command, parsed_args, required_args, operators, arguments, prompt_info)
 
-        hook_response = {
-            "systemMessage": system_message,  # Compact user confirmation
-            "hookSpecificOutput": {
-                "hookEventName": "UserPromptSubmit",
-                "additionalContext": directive,  # Structured directive for Claude
-            },
-        }
-        print(json.dumps(hook_response))
+        # Compact user confirmation + structured directive for Claude
+        emit_response(system_message, directive)
         sys.exit(0)
 
     # === CHAIN ENFORCEMENT: Active chain needs continuation ===
@@ -755,11 +763,7 @@ def main():
                 )
 
             system_msg = format_chain_reminder(session_state, mode="inline")
-            hook_response = {
-                "systemMessage": system_msg,
-                "hookSpecificOutput": {"hookEventName": "UserPromptSubmit", "additionalContext": directive},
-            }
-            print(json.dumps(hook_response))
+            emit_response(system_msg, directive)
             sys.exit(0)
 
     # === INFORMATIONAL MODE: No >>syntax, no active chain ===
@@ -784,11 +788,7 @@ def main():
     # Output informational context (same to both user and Claude)
     if output_lines:
         output = "\n".join(output_lines)
-        hook_response = {
-            "systemMessage": output,
-            "hookSpecificOutput": {"hookEventName": "UserPromptSubmit", "additionalContext": output},
-        }
-        print(json.dumps(hook_response))
+        emit_response(output, output)
         sys.exit(0)
     else:
         sys.exit(0)
@@ -13,12 +13,13 @@ This data feeds the session story for context-isolated Ralph instances.
 """
 
 import json
+import os
 import sys
-from pathlib import Path
 
 # Add hooks lib to path
-sys.path.insert(0, str(Path(__file__).parent / "lib"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "lib"))
 
+from json_codec import loads, read_stdin_bytes
 from lesson_extractor import summarize_error
 from session_tracker import get_session_tracker
 from verify_active_store import load_verify_active_state
@@ -27,7 +28,7 @@ from verify_active_store import load_verify_active_state
 def parse_hook_input() -> dict:
     """Parse JSON input from Claude Code hook system."""
     try:
-        return json.load(sys.stdin)
+        return loads(read_stdin_bytes())
     except json.JSONDecodeError:
         return {}
 
@@ -122,6 +123,7 @@ def main():
         change = extract_file_change_details(tool_input, tool_name)
         if change:
             tracker.record_file_change(file_path=change["file"], change_type=change["type"], details=change["details"])
+            tracker.flush()
 
     # Track Bash commands (for context about what was run)
     if "Bash" in tool_name:
@@ -18,15 +18,14 @@ This integrates with the :: verify:"command" loop:true syntax in prompt_engine.
 
 import json
 import os
-import subprocess
 import sys
-import uuid
 from pathlib import Path
 
 # Add hooks lib to path
-sys.path.insert(0, str(Path(__file__).parent / "lib"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "lib"))
 
 from db_reader import load_active_chain_state
+from json_codec import loads, read_stdin_bytes, write_stdout
 from verify_active_store import (
     clear_verify_active_state,
     load_verify_active_state,
@@ -47,6 +46,8 @@ def ensure_ralph_session_id(verify_state: dict) -> str:
 
     if not session_id:
         # Generate a new session ID
+        import uuid
+
         session_id = f"ralph-{uuid.uuid4().hex[:8]}"
 
     # Export for context tracking hooks
@@ -122,6 +123,9 @@ def clear_verify_state(session_id: str | None = None) -> None:
 
 def run_verification(command: str, timeout: int, working_dir: str | None = None) -> dict:
     """Execute verification command and return result."""
+    # Deferred: most Stop events exit before any verification runs
+    import subprocess
+
     cwd = working_dir or os.getcwd()
 
     try:
@@ -228,7 +232,7 @@ def spawn_isolated_iteration(verify_state: dict, last_result: dict, isolation_co
 
     # Import here to avoid import errors when not in isolation mode
     from cli_spawner import SpawnConfig, spawn_claude_print
-    from session_tracker import get_session_tracker
+    from session_tracker import command_directory, get_session_tracker
     from task_protocol import create_task_file
 
     config = verify_state["config"]
@@ -270,16 +274,11 @@ def spawn_isolated_iteration(verify_state: dict, last_result: dict, isolation_co
     log_debug("TASK FILE CONTENT", task_content[:3000])
 
     # Determine working directory - try to extract from verification command if not set
-    import re
-
     working_dir = config.get("workingDir")
     if not working_dir:
-        # Extract directory from file paths in the command
-        paths = re.findall(r"(/[^\s]+)", config["command"])
-        if paths:
-            test_path = Path(paths[0])
-            if test_path.parent.exists():
-                working_dir = str(test_path.parent)
+        command_dir = command_directory(config["command"])
+        if command_dir:
+            working_dir = str(command_dir)
 
     # Spawn CLI - output_format is forced to JSON by spawn_claude_print for stats
     spawn_config = SpawnConfig(
@@ -357,7 +356,7 @@ def spawn_isolated_iteration(verify_state: dict, last_result: dict, isolation_co
 def main():
     # Read hook input from stdin (Claude Code passes context here)
     try:
-        hook_input = json.load(sys.stdin)
+        hook_input = loads(read_stdin_bytes())
     except (json.JSONDecodeError, EOFError):
         hook_input = {}
 
@@ -402,7 +401,7 @@ def main():
                         f'  prompt_engine(chain_id="{chain_id}")'
                     )
 
-                print(json.dumps({"decision": "block", "reason": reason}))
+                write_stdout({"decision": "block", "reason": reason})
                 sys.stdout.flush()
                 sys.exit(0)
 
@@ -437,13 +436,11 @@ def main():
     if iteration >= max_iterations:
         # Max iterations reached - clear state and allow stop
         clear_verify_state(hook_session_id or None)
-        print(
-            json.dumps(
-                {
-                    "decision": None,  # Allow stop
-                    "systemMessage": f"[Verify] Max iterations ({max_iterations}) reached. Stopping.",
-                }
-            )
+        write_stdout(
+            {
+                "decision": None,  # Allow stop
+                "systemMessage": f"[Verify] Max iterations ({max_iterations}) reached. Stopping.",
+            }
         )
         sys.stdout.flush()
         sys.exit(0)
@@ -481,13 +478,11 @@ def main():
         except Exception:
             pass  # Non-critical — don't fail verification success
 
-        print(
-            json.dumps(
-                {
-                    "decision": None,  # Allow stop
-                    "systemMessage": f"[Verify] PASSED on iteration {iteration}!",
-                }
-            )
+        write_stdout(
+            {
+                "decision": None,  # Allow stop
+                "systemMessage": f"[Verify] PASSED on iteration {iteration}!",
+            }
         )
         sys.stdout.flush()
         sys.exit(0)
@@ -498,7 +493,7 @@ def main():
         if os.environ.get("RALPH_SPAWNED"):
             # Already spawned - continue in-context
             reason = format_error_feedback(result, verify_state)
-            print(json.dumps({"decision": "block", "reason": reason}))
+            write_stdout({"decision": "block", "reason": reason})
             sys.stdout.flush()
             sys.exit(0)
 
@@ -536,20 +531,18 @@ def main():
 ### Result
 {spawn_result["output"][:800]}"""
 
-                print(
-                    json.dumps(
-                        {
-                            "decision": None,
-                            "systemMessage": message,
-                            "metadata": {
-                                "type": "ralph_verification",
-                                "passed": True,
-                                "iteration": iteration,
-                                "method": "isolated",
-                                "stats": stats,
-                            },
-                        }
-                    )
+                write_stdout(
+                    {
+                        "decision": None,
+                        "systemMessage": message,
+                        "metadata": {
+                            "type": "ralph_verification",
+                            "passed": True,
+                            "iteration": iteration,
+                            "method": "isolated",
+                            "stats": stats,
+                        },
+                    }
                 )
                 sys.stdout.flush()
                 sys.exit(0)
@@ -577,21 +570,19 @@ The context-isolated Claude instance could not fix the issue.{stats_line}
 
 Please review the isolated attempt and try a different approach."""
 
-                print(
-                    json.dumps(
-                        {
-                            "decision": "block",
-                            "reason": reason,
-                            "metadata": {
-                                "type": "ralph_verification",
-                                "passed": False,
-                                "iteration": iteration,
-                                "max_iterations": max_iterations,
-                                "method": "isolated",
-                                "stats": stats,
-                            },
-                        }
-                    )
+                write_stdout(
+                    {
+                        "decision": "block",
+                        "reason": reason,
+                        "metadata": {
+                            "type": "ralph_verification",
+                            "passed": False,
+                            "iteration": iteration,
+                            "max_iterations": max_iterations,
+                            "method": "isolated",
+                            "stats": stats,
+                        },
+                    }
                 )
                 sys.stdout.flush()
                 sys.exit(0)
@@ -600,7 +591,7 @@ Please review the isolated attempt and try a different approach."""
             # Libraries not available - fall back to in-context
             print(f"[Verify] Isolation libraries unavailable: {e}", file=sys.stderr)
             reason = format_error_feedback(result, verify_state)
-            print(json.dumps({"decision": "block", "reason": reason}))
+            write_stdout({"decision": "block", "reason": reason})
             sys.stdout.flush()
             sys.exit(0)
 
@@ -608,14 +599,14 @@ Please review the isolated attempt and try a different approach."""
             # Spawn failed - fall back to in-context
             print(f"[Verify] Isolation spawn failed: {e}", file=sys.stderr)
             reason = format_error_feedback(result, verify_state)
-            print(json.dumps({"decision": "block", "reason": reason}))
+            write_stdout({"decision": "block", "reason": reason})
             sys.stdout.flush()
             sys.exit(0)
 
     # In-context mode - block stop and feed error back
     reason = format_error_feedback(result, verify_state)
 
-    print(json.dumps({"decision": "block", "reason": reason}))
+    write_stdout({"decision": "block", "reason": reason})
     sys.stdout.flush()
     sys.exit(0)
 
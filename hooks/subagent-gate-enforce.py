@@ -12,10 +12,11 @@ Data flow:
 """
 
 import json
+import os
 import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent / "lib"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "lib"))
+from json_codec import loads, read_stdin_bytes, write_stdout
 from ralph_subagent_contract import (
     extract_quality_gates,
     has_original_intent,
@@ -34,7 +35,7 @@ def log(msg: str) -> None:
 def parse_hook_input() -> dict:
     """Parse JSON input from Claude Code hook system."""
     try:
-        return json.load(sys.stdin)
+        return loads(read_stdin_bytes())
     except json.JSONDecodeError:
         return {}
 
@@ -185,7 +186,7 @@ def main():
                 "`GATE_REVIEW: PASS \u2014 [rationale]` or `GATE_REVIEW: FAIL \u2014 [rationale]`"
             ),
         }
-        print(json.dumps(response))
+        write_stdout(response)
         sys.exit(0)
 
     verdict, rationale = verdict_result
@@ -203,7 +204,7 @@ def main():
                 "`GATE_REVIEW: PASS \u2014 [rationale]`"
             ),
         }
-        print(json.dumps(response))
+        write_stdout(response)
         sys.exit(0)
 
     if ralph_protocol:
@@ -221,7 +222,7 @@ def main():
                     "`GATE_REVIEW: PASS — [rationale]`"
                 ),
             }
-            print(json.dumps(response))
+            write_stdout(response)
             sys.exit(0)
 
     # Check for criterion coverage when Original Request Intent was in the prompt
@@ -0,0 +1,162 @@
+"""
+Tests for hooks/lib/cache_manager.py query helpers.
+
+Covers:
+- Levenshtein distance against a reference implementation
+- Fuzzy prompt-id matching scores
+- Intent matching scores over the precomputed prompt index
+- Gate suggestions via the precomputed work-type index
+- Cache memoization keyed on the state.db / WAL signature
+"""
+
+import itertools
+import os
+
+import cache_manager
+from cache_manager import levenshtein_distance
+
+
+def _reference_levenshtein(a: str, b: str) -> int:
+    """Textbook full-matrix edit distance."""
+    rows = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        rows[i][0] = i
+    for j in range(len(b) + 1):
+        rows[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            rows[i][j] = min(
+                rows[i - 1][j] + 1,
+                rows[i][j - 1] + 1,
+                rows[i - 1][j - 1] + (a[i - 1] != b[j - 1]),
+            )
+    return rows[len(a)][len(b)]
+
+
+class TestLevenshteinDistance:
+    def test_known_distances(self):
+        assert levenshtein_distance("kitten", "sitting") == 3
+        assert levenshtein_distance("", "abc") == 3
+        assert levenshtein_distance("abc", "") == 3
+        assert levenshtein_distance("same", "same") == 0
+
+    def test_matches_reference(self):
+        words = ["", "a", "ab", "analyze", "analysis", "deep_analysis", "review", "code-review", "xyz"]
+        for a, b in itertools.product(words, repeat=2):
+            assert levenshtein_distance(a, b) == _reference_levenshtein(a, b), (a, b)
+
+
+class TestFuzzyMatchPromptId:
+    def test_prefix_and_typo_ranking(self, monkeypatch):
+        prompts = {"deep_analysis": {}, "code_review": {}, "Analyze_Code": {}, "unrelated": {}}
+        monkeypatch.setattr(cache_manager, "load_prompts_cache", lambda: {"prompts": prompts})
+
+        assert cache_manager.fuzzy_match_prompt_id("deep") == ["deep_analysis"]
+        # Typo within threshold still surfaces, returned lowercase
+        assert cache_manager.fuzzy_match_prompt_id("analyse_code")[0] == "analyze_code"
+
+    def test_empty_cache(self, monkeypatch):
+        monkeypatch.setattr(cache_manager, "load_prompts_cache", lambda: None)
+        assert cache_manager.fuzzy_match_prompt_id("anything") == []
+
+
+PROMPTS = {
+    "code_review": {
+        "name": "Code Review Helper",
+        "category": "development",
+        "keywords": ["review", "bug"],
+        "is_chain": False,
+    },
+    "research_chain": {
+        "name": "Deep Research",
+        "category": "research",
+        "keywords": ["investigate"],
+        "is_chain": True,
+    },
+    "misc": {"name": "Misc", "category": "other", "keywords": []},
+}
+
+
+class TestMatchPromptsToIntent:
+    def test_scores_keywords_category_name_and_chain_boost(self, monkeypatch):
+        cache = {"prompts": PROMPTS}
+        monkeypatch.setattr(cache_manager, "load_prompts_cache", lambda: cache)
+
+        result = cache_manager.match_prompts_to_intent("please review this bug in my code")
+        # 2 keywords (20) + name words "code" and "review" (30); "helper" absent
+        assert [(pid, score) for pid, _, score in result] == [("code_review", 50)]
+
+        result = cache_manager.match_prompts_to_intent("deep research: investigate caching")
+        # keyword (10) + category (20) + name words "deep"/"research" (30) + chain boost (5)
+        assert [(pid, score) for pid, _, score in result] == [("research_chain", 65)]
+
+    def test_prebuilt_index_matches_lazy_index(self, monkeypatch):
+        lazy = {"prompts": PROMPTS}
+        prebuilt = {"prompts": PROMPTS, "_index": cache_manager._build_prompt_index(PROMPTS)}
+        query = "investigate the review of development research"
+
+        monkeypatch.setattr(cache_manager, "load_prompts_cache", lambda: lazy)
+        expected = cache_manager.match_prompts_to_intent(query)
+        monkeypatch.setattr(cache_manager, "load_prompts_cache", lambda: prebuilt)
+        assert cache_manager.match_prompts_to_intent(query) == expected
+
+
+GATES = {
+    "code-quality": {"name": "Code Quality", "triggers": []},
+    "security-awareness": {"name": "Security Awareness", "triggers": ["security"]},
+    "content-structure": {"name": "Content Structure", "triggers": ["structure"]},
+    "test-coverage": {"name": "Coverage", "triggers": ["test"]},
+    "research-accuracy": {"name": "Research Accuracy", "triggers": []},
+}
+
+
+class TestSuggestGatesForWork:
+    def test_orders_by_work_type_then_cache_order(self, monkeypatch):
+        monkeypatch.setattr(cache_manager, "load_gates_cache", lambda: {"gates": GATES})
+        result = cache_manager.suggest_gates_for_work(["security", "code"])
+        assert [gate_id for gate_id, _ in result] == ["security-awareness", "code-quality", "test-coverage"]
+
+    def test_dedupes_across_work_types_and_ignores_unknown(self, monkeypatch):
+        cache = {"gates": GATES, "_work_type_index": cache_manager._build_work_type_index(GATES)}
+        monkeypatch.setattr(cache_manager, "load_gates_cache", lambda: cache)
+        result = cache_manager.suggest_gates_for_work(["unknown", "research", "documentation"])
+        # "quality" (research keyword) matches code-quality by name; content-structure via "content"
+        assert [gate_id for gate_id, _ in result] == ["code-quality", "content-structure", "research-accuracy"]
+
+
+class TestCacheMemoization:
+    def _setup(self, patch_workspace, monkeypatch):
+        db_dir = patch_workspace["server"] / "runtime-state"
+        db_dir.mkdir(parents=True, exist_ok=True)
+        db_path = db_dir / "state.db"
+        db_path.write_bytes(b"v1")
+
+        calls = []
+
+        def fake_load_prompts():
+            calls.append(1)
+            return {"prompts": {"p": {"name": "P", "category": "c", "keywords": []}}}
+
+        monkeypatch.setattr(cache_manager, "_loaded_caches", {})
+        monkeypatch.setattr(cache_manager, "load_prompts", fake_load_prompts)
+        return db_path, calls
+
+    def test_reuses_cache_while_db_unchanged(self, patch_workspace, monkeypatch):
+        _, calls = self._setup(patch_workspace, monkeypatch)
+        first = cache_manager.load_prompts_cache()
+        assert cache_manager.load_prompts_cache() is first
+        assert len(calls) == 1
+        assert "_index" in first
+
+    def test_wal_write_invalidates(self, patch_workspace, monkeypatch):
+        db_path, calls = self._setup(patch_workspace, monkeypatch)
+        cache_manager.load_prompts_cache()
+
+        wal = db_path.with_name("state.db-wal")
+        wal.write_bytes(b"frame")
+        cache_manager.load_prompts_cache()
+        assert len(calls) == 2
+
+        os.utime(db_path, ns=(0, 0))
+        cache_manager.load_prompts_cache()
+        assert len(calls) == 3
@@ -0,0 +1,450 @@
+"""
+Tests for cli_spawner process handling.
+
+Covers:
+- _terminate SIGTERM -> SIGKILL escalation with bounded waits
+- blocking spawn paths (decoding, timeout, missing binary)
+- _get_spawn_env snapshot caching
+- _build_command memoization
+- CircuitBreaker decayed failure counting
+- _get_ralph_tasks_dir creation caching (workspace.ensure_dir)
+- _calculate_backoff_delay jitter modes (symmetric keeps the previous schedule)
+- spawn_batch_iter completion-order streaming and concurrency bound
+- parse_spawn_result JSON vs text handling
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+HOOKS_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(HOOKS_DIR / "lib"))
+
+import cli_spawner
+import workspace
+
+
+def _spawn_python(code: str):
+    return asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        code,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+
+class TestTerminate:
+    def test_terminates_running_process(self):
+        async def run():
+            process = await _spawn_python("import time; time.sleep(30)")
+            await cli_spawner._terminate(process, grace=5.0)
+            return process.returncode
+
+        assert asyncio.run(run()) is not None
+
+    def test_escalates_to_kill_when_sigterm_ignored(self):
+        code = (
+            "import signal, sys, time\n"
+            "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+            "print('ready', flush=True)\n"
+            "time.sleep(30)\n"
+        )
+
+        async def run():
+            process = await _spawn_python(code)
+            await process.stdout.readline()
+            await cli_spawner._terminate(process, grace=0.2)
+            return process.returncode
+
+        # Negative return code = killed by signal; -9 is SIGKILL
+        assert asyncio.run(run()) == -9
+
+    def test_already_exited_process_is_noop(self):
+        async def run():
+            process = await _spawn_python("pass")
+            await process.wait()
+            await cli_spawner._terminate(process, grace=0.2)
+            return process.returncode
+
+        assert asyncio.run(run()) == 0
+
+
+class TestSpawnAsync:
+    def _run(self, monkeypatch, code: str, timeout: int, prompt: str = "hello"):
+        monkeypatch.setattr(cli_spawner, "_build_command", lambda config: [sys.executable, "-c", code])
+        config = cli_spawner.SpawnConfig(timeout_seconds=timeout)
+        retry = cli_spawner.RetryConfig(max_retries=0)
+        return asyncio.run(cli_spawner.spawn_claude_print_async(prompt, config, retry, use_circuit_breaker=False))
+
+    def test_output_captured(self, monkeypatch):
+        result = self._run(monkeypatch, "import sys; print(sys.stdin.read().upper())", timeout=10)
+        assert result.success
+        assert result.output == "HELLO\n"
+        assert result.error is None
+
+    def test_large_payload_round_trip(self, monkeypatch):
+        code = "import sys; data = sys.stdin.buffer.read(); sys.stdout.buffer.write(data); sys.stderr.write('done')"
+        result = self._run(monkeypatch, code, timeout=10, prompt="x" * (1 << 20))
+        assert result.output == "x" * (1 << 20)
+        assert result.error == "done"
+
+    def test_child_exiting_without_reading_stdin(self, monkeypatch):
+        code = "import sys; sys.stderr.write('bye'); sys.exit(3)"
+        result = self._run(monkeypatch, code, timeout=10, prompt="y" * (1 << 20))
+        assert (result.output, result.error, result.exit_code) == ("", "bye", 3)
+
+    def test_cancellation_reaps_child(self, monkeypatch):
+        code = "import os, time; print(os.getpid(), flush=True); time.sleep(30)"
+        monkeypatch.setattr(cli_spawner, "_build_command", lambda config: [sys.executable, "-c", code])
+        created = []
+        real_exec = asyncio.create_subprocess_exec
+
+        async def recording_exec(*args, **kwargs):
+            process = await real_exec(*args, **kwargs)
+            created.append(process)
+            return process
+
+        monkeypatch.setattr(cli_spawner.asyncio, "create_subprocess_exec", recording_exec)
+
+        async def run():
+            task = asyncio.ensure_future(
+                cli_spawner.spawn_claude_print_async("x", cli_spawner.SpawnConfig(timeout_seconds=30), None, False)
+            )
+            while not created:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return created[0].returncode
+
+        assert asyncio.run(run()) is not None
+
+    def test_timeout_reports_and_reaps(self, monkeypatch):
+        result = self._run(monkeypatch, "import time; time.sleep(30)", timeout=1)
+        assert result.timed_out
+        assert result.exit_code == -1
+
+
+class TestSpawnDataclasses:
+    def test_slotted_without_instance_dict(self):
+        stats = cli_spawner.SpawnStats(input_tokens=1)
+        result = cli_spawner.SpawnResult(True, "out", None, 0, False, stats=stats)
+        config = cli_spawner.SpawnConfig(client="claude")
+        for instance in (stats, result, config):
+            assert not hasattr(instance, "__dict__")
+        result.retries_used = 2  # Still mutable
+        assert result.retries_used == 2
+
+
+class TestBuildCommandCache:
+    def test_returns_fresh_list_per_call(self):
+        config = cli_spawner.SpawnConfig(client="claude")
+        first = cli_spawner._build_command(config)
+        first.append("--mutated")
+        assert "--mutated" not in cli_spawner._build_command(config)
+
+    def test_int_and_float_budgets_format_independently(self):
+        int_cmd = cli_spawner._build_command(cli_spawner.SpawnConfig(client="claude", max_budget_usd=1))
+        float_cmd = cli_spawner._build_command(cli_spawner.SpawnConfig(client="claude", max_budget_usd=1.0))
+        assert "--max-budget-usd=1" in int_cmd
+        assert "--max-budget-usd=1.0" in float_cmd
+
+
+class TestSpawnBlocking:
+    def _use_script(self, monkeypatch, code: str):
+        monkeypatch.setattr(cli_spawner, "_build_command", lambda config: [sys.executable, "-c", code])
+
+    def test_output_and_stderr_decoded(self, monkeypatch):
+        self._use_script(
+            monkeypatch,
+            "import sys; data = sys.stdin.read(); print(data[::-1]); sys.stderr.write('w\u00e4rn'); sys.exit(2)",
+        )
+        result = cli_spawner._spawn_claude_print_blocking("abc\u00e9", cli_spawner.SpawnConfig())
+        assert result.output == "\u00e9cba\n"
+        assert result.error == "w\u00e4rn"
+        assert result.exit_code == 2
+        assert not result.success
+
+    def test_invalid_utf8_replaced_and_newlines_translated(self, monkeypatch):
+        self._use_script(monkeypatch, r"import sys; sys.stdout.buffer.write(b'ok\xff\r\ndone\r\n')")
+        result = cli_spawner._spawn_claude_print_blocking("x", cli_spawner.SpawnConfig())
+        assert result.output == "ok\ufffd\ndone\n"
+
+    def test_json_output_parsed_for_stats(self, monkeypatch):
+        payload = '{"result": "done", "usage": {"input_tokens": 7}, "num_turns": 2}'
+        self._use_script(monkeypatch, f"print({payload!r})")
+        result = cli_spawner.spawn_claude_print("go", cli_spawner.SpawnConfig())
+        assert result.success
+        assert result.output == "done"
+        assert result.stats.input_tokens == 7
+        assert result.error is None
+
+    def test_timeout_kills_child(self, monkeypatch):
+        self._use_script(monkeypatch, "import time; time.sleep(30)")
+        result = cli_spawner._spawn_claude_print_blocking("x", cli_spawner.SpawnConfig(timeout_seconds=1))
+        assert result.timed_out
+        assert result.exit_code == -1
+
+    def test_missing_binary(self, monkeypatch):
+        monkeypatch.setattr(cli_spawner, "_build_command", lambda config: ["definitely-not-a-real-cli-binary"])
+        result = cli_spawner._spawn_claude_print_blocking("x", cli_spawner.SpawnConfig(client="claude"))
+        assert result.error == "Claude CLI not found. Is claude-code installed?"
+
+
+class TestSpawnEnv:
+    def test_snapshot_is_reused(self, monkeypatch):
+        monkeypatch.setattr(cli_spawner, "_spawn_env", None)
+        monkeypatch.setenv("RALPH_TEST_VAR", "one")
+        env = cli_spawner._get_spawn_env()
+        assert env["RALPH_SPAWNED"] == "true"
+        assert env["RALPH_TEST_VAR"] == "one"
+        assert cli_spawner._get_spawn_env() is env
+
+        monkeypatch.setenv("RALPH_TEST_VAR", "two")
+        assert cli_spawner._get_spawn_env()["RALPH_TEST_VAR"] == "one"
+
+
+def _fake_spawner(monkeypatch, delays: dict[str, float]):
+    """Replace spawn_claude_print_async with a sleep; records peak concurrency."""
+    stats = {"running": 0, "peak": 0}
+
+    async def fake_spawn(prompt, config=None, retry_config=None, use_circuit_breaker=True):
+        if prompt == "boom":
+            raise RuntimeError("spawn exploded")
+        stats["running"] += 1
+        stats["peak"] = max(stats["peak"], stats["running"])
+        await asyncio.sleep(delays[prompt])
+        stats["running"] -= 1
+        return cli_spawner.SpawnResult(True, prompt, None, 0, False)
+
+    monkeypatch.setattr(cli_spawner, "spawn_claude_print_async", fake_spawn)
+    return stats
+
+
+class TestSpawnBatch:
+    def test_iter_yields_in_completion_order(self, monkeypatch):
+        _fake_spawner(monkeypatch, {"slow": 0.2, "fast": 0.0, "mid": 0.05})
+        tasks = [("slow", None), ("fast", None), ("mid", None)]
+
+        async def run():
+            return [(idx, result.output) async for idx, result in cli_spawner.spawn_batch_iter(tasks)]
+
+        assert asyncio.run(run()) == [(1, "fast"), (2, "mid"), (0, "slow")]
+
+    def test_batch_preserves_task_order_and_bound(self, monkeypatch):
+        delays = {f"p{i}": 0.01 * (5 - i) for i in range(5)}
+        stats = _fake_spawner(monkeypatch, delays)
+        tasks = [(prompt, None) for prompt in delays]
+
+        results = asyncio.run(cli_spawner.spawn_batch_async(tasks, max_concurrent=2))
+        assert [r.output for r in results] == list(delays)
+        assert stats["peak"] == 2
+
+    def test_spawn_exception_propagates(self, monkeypatch):
+        _fake_spawner(monkeypatch, {"ok": 0.0})
+        with pytest.raises(RuntimeError, match="spawn exploded"):
+            asyncio.run(cli_spawner.spawn_batch_async([("ok", None), ("boom", None)]))
+
+    def test_failure_cancels_running_siblings(self, monkeypatch):
+        cancelled = []
+
+        async def fake_spawn(prompt, config=None, retry_config=None, use_circuit_breaker=True):
+            if prompt == "boom":
+                await asyncio.sleep(0.05)
+                raise RuntimeError("spawn exploded")
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(prompt)
+                raise
+
+        monkeypatch.setattr(cli_spawner, "spawn_claude_print_async", fake_spawn)
+        tasks = [("slow-a", None), ("boom", None), ("slow-b", None)]
+        with pytest.raises(RuntimeError):
+            asyncio.run(asyncio.wait_for(cli_spawner.spawn_batch_async(tasks), 5))
+        assert sorted(cancelled) == ["slow-a", "slow-b"]
+
+    def test_empty_batch(self):
+        assert asyncio.run(cli_spawner.spawn_batch_async([])) == []
+
+
+class TestParseSpawnResult:
+    def test_json_output_returned_as_is(self):
+        result = cli_spawner.SpawnResult(True, ' {"status": "FAIL", "summary": "x"}', None, 0, False)
+        assert cli_spawner.parse_spawn_result(result) == {"status": "FAIL", "summary": "x"}
+
+    def test_extracted_text_result_scanned_for_status(self):
+        stats = cli_spawner.SpawnStats(input_tokens=10)
+        result = cli_spawner.SpawnResult(False, "All checks pass now.", None, 1, False, stats=stats)
+        parsed = cli_spawner.parse_spawn_result(result)
+        assert parsed["status"] == "PASS"
+        assert parsed["output"] == "All checks pass now."
+
+    def test_fail_marker_and_malformed_json(self):
+        result = cli_spawner.SpawnResult(True, "{broken: Tests failed", None, 0, False)
+        assert cli_spawner.parse_spawn_result(result)["status"] == "FAIL"
+
+    def test_no_marker_keeps_exit_status(self):
+        result = cli_spawner.SpawnResult(False, "", "boom", 2, False)
+        parsed = cli_spawner.parse_spawn_result(result)
+        assert parsed["status"] == "FAIL"
+        assert parsed["error"] == "boom"
+
+
+class TestCircuitBreakerDecay:
+    def _breaker(self, monkeypatch):
+        clock = {"now": 1_000_000.0}
+        monkeypatch.setattr(cli_spawner.time, "time", lambda: clock["now"])
+        return cli_spawner.CircuitBreaker(), clock
+
+    def test_burst_of_threshold_failures_opens(self, monkeypatch):
+        breaker, clock = self._breaker(monkeypatch)
+        for delay in (0, 1, 2, 4, 8):  # Default backoff spacing
+            clock["now"] += delay
+            breaker.record_failure()
+        assert breaker.state == cli_spawner.CircuitBreakerState.OPEN
+
+    def test_zero_tolerance_needs_full_threshold(self, monkeypatch):
+        clock = {"now": 1_000_000.0}
+        monkeypatch.setattr(cli_spawner.time, "time", lambda: clock["now"])
+        breaker = cli_spawner.CircuitBreaker(cli_spawner.CircuitBreakerConfig(failure_count_tolerance=0.0))
+        for delay in (0, 1, 2, 4, 8):
+            clock["now"] += delay
+            breaker.record_failure()
+        assert breaker.state == cli_spawner.CircuitBreakerState.CLOSED
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == cli_spawner.CircuitBreakerState.OPEN
+
+    def test_spread_out_failures_stay_closed(self, monkeypatch):
+        breaker, clock = self._breaker(monkeypatch)
+        for _ in range(10):
+            clock["now"] += 900  # One failure every 15 minutes
+            breaker.record_failure()
+        assert breaker.state == cli_spawner.CircuitBreakerState.CLOSED
+        assert breaker.can_execute()
+
+    def test_success_resets_count(self, monkeypatch):
+        breaker, clock = self._breaker(monkeypatch)
+        for _ in range(4):
+            breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == cli_spawner.CircuitBreakerState.CLOSED
+
+
+class TestTasksDir:
+    def test_created_once_per_workspace(self, patch_workspace, monkeypatch):
+        monkeypatch.setattr(workspace, "_ensured_dirs", set())
+        tasks_dir = cli_spawner._get_ralph_tasks_dir()
+        assert tasks_dir == patch_workspace["server"] / "runtime-state" / "ralph-tasks"
+        assert tasks_dir.is_dir()
+
+        mkdir_calls = []
+        monkeypatch.setattr(Path, "mkdir", lambda self, *a, **kw: mkdir_calls.append(self))
+        assert cli_spawner._get_ralph_tasks_dir() == tasks_dir
+        assert mkdir_calls == []
+
+    def test_new_workspace_gets_its_own_dir(self, patch_workspace, monkeypatch, tmp_path):
+        monkeypatch.setattr(workspace, "_ensured_dirs", set())
+        first = cli_spawner._get_ralph_tasks_dir()
+        other = tmp_path / "other-workspace"
+        (other / "server").mkdir(parents=True)
+        monkeypatch.setenv("MCP_WORKSPACE", str(other))
+        second = cli_spawner._get_ralph_tasks_dir()
+        assert second != first
+        assert second.is_dir()
+
+
+class TestBackoffDelay:
+    def test_no_jitter_is_plain_exponential(self):
+        config = cli_spawner.RetryConfig(jitter=False)
+        assert [cli_spawner._calculate_backoff_delay(a, config) for a in range(7)] == [1, 2, 4, 8, 16, 30, 30]
+
+    def test_symmetric_stays_within_25_percent(self):
+        config = cli_spawner.RetryConfig(jitter_mode="symmetric")
+        for _ in range(200):
+            assert 3.0 <= cli_spawner._calculate_backoff_delay(2, config) < 5.0
+
+    def test_symmetric_reproduces_previous_schedule(self, monkeypatch):
+        # The pre-decorrelated default: min(base * 2**attempt, max) scaled by [0.75, 1.25)
+        config = cli_spawner.RetryConfig(jitter_mode="symmetric")
+        rolls = (0.0, 0.5, 0.999, 0.25, 0.75, 0.1, 0.9)
+        next_roll = iter(rolls)
+        monkeypatch.setattr(cli_spawner.random, "random", lambda: next(next_roll))
+        delays = [cli_spawner._calculate_backoff_delay(a, config) for a in range(7)]
+        expected = [min(2.0**a, 30.0) * (0.75 + 0.5 * r) for a, r in enumerate(rolls)]
+        assert delays == pytest.approx(expected)
+
+    def test_full_jitter_within_exponential_window(self):
+        config = cli_spawner.RetryConfig(jitter_mode="full")
+        for _ in range(200):
+            assert 0.0 <= cli_spawner._calculate_backoff_delay(3, config) <= 8.0
+
+    def test_decorrelated_grows_from_previous_delay(self):
+        config = cli_spawner.RetryConfig()
+        assert config.jitter_mode == "decorrelated"
+        for _ in range(200):
+            first = cli_spawner._calculate_backoff_delay(0, config)
+            assert 1.0 <= first <= 3.0
+            following = cli_spawner._calculate_backoff_delay(1, config, previous_delay=first)
+            assert 1.0 <= following <= first * 3
+            assert cli_spawner._calculate_backoff_delay(5, config, previous_delay=25.0) <= 30.0
+
+
+class TestCircuitBreakerStates:
+    def _tripped_breaker(self, monkeypatch, half_open_max_calls=1):
+        clock = {"now": 1_000_000.0}
+        monkeypatch.setattr(cli_spawner.time, "time", lambda: clock["now"])
+        config = cli_spawner.CircuitBreakerConfig(failure_threshold=2, half_open_max_calls=half_open_max_calls)
+        breaker = cli_spawner.CircuitBreaker(config)
+        breaker.record_failure()
+        breaker.record_failure()
+        return breaker, clock
+
+    def test_open_rejects_until_recovery_timeout(self, monkeypatch):
+        breaker, clock = self._tripped_breaker(monkeypatch)
+        assert breaker.state == cli_spawner.CircuitBreakerState.OPEN
+        assert not breaker.can_execute()
+        clock["now"] += 59
+        assert not breaker.can_execute()
+        clock["now"] += 1
+        assert breaker.state == cli_spawner.CircuitBreakerState.HALF_OPEN
+        assert breaker.can_execute()
+
+    def test_half_open_success_closes(self, monkeypatch):
+        breaker, clock = self._tripped_breaker(monkeypatch, half_open_max_calls=2)
+        clock["now"] += 60
+        assert breaker.can_execute()
+        breaker.record_success()
+        assert breaker.state == cli_spawner.CircuitBreakerState.HALF_OPEN
+        assert breaker.can_execute()
+        breaker.record_success()
+        assert breaker.state == cli_spawner.CircuitBreakerState.CLOSED
+        breaker.record_failure()
+        assert breaker.state == cli_spawner.CircuitBreakerState.CLOSED
+
+    def test_half_open_failure_reopens(self, monkeypatch):
+        breaker, clock = self._tripped_breaker(monkeypatch)
+        clock["now"] += 60
+        breaker.record_failure()
+        assert breaker.state == cli_spawner.CircuitBreakerState.OPEN
+        clock["now"] += 59
+        assert not breaker.can_execute()
+
+    def test_failure_while_open_extends_window(self, monkeypatch):
+        breaker, clock = self._tripped_breaker(monkeypatch)
+        clock["now"] += 30
+        breaker.record_failure()
+        clock["now"] += 45
+        assert breaker.state == cli_spawner.CircuitBreakerState.OPEN
+
+    def test_success_while_open_is_ignored(self, monkeypatch):
+        breaker, clock = self._tripped_breaker(monkeypatch)
+        breaker.record_success()
+        clock["now"] += 60
+        assert breaker.state == cli_spawner.CircuitBreakerState.HALF_OPEN
@@ -0,0 +1,49 @@
+"""
+Tests for hooks/lib/config_loader.py.
+
+Covers:
+- defaults when server/config.json is missing or malformed
+- parsed config reuse until the file changes
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+HOOKS_LIB = Path(__file__).parent.parent / "lib"
+sys.path.insert(0, str(HOOKS_LIB))
+
+import config_loader
+
+
+def _write_config(patch_workspace, payload: str) -> Path:
+    config_path = patch_workspace["server"] / "config.json"
+    config_path.write_text(payload, encoding="utf-8")
+    return config_path
+
+
+class TestLoadConfig:
+    def test_missing_file_returns_defaults(self, patch_workspace, monkeypatch):
+        monkeypatch.setattr(config_loader, "_config_cache", None)
+        assert config_loader.load_config() == config_loader.DEFAULT_CONFIG
+        assert config_loader.is_expanded_output() is False
+
+    def test_malformed_file_returns_defaults(self, patch_workspace, monkeypatch):
+        monkeypatch.setattr(config_loader, "_config_cache", None)
+        _write_config(patch_workspace, "{not json")
+        assert config_loader.load_config() == config_loader.DEFAULT_CONFIG
+
+    def test_reuses_parse_until_file_changes(self, patch_workspace, monkeypatch):
+        monkeypatch.setattr(config_loader, "_config_cache", None)
+        config_path = _write_config(patch_workspace, json.dumps({"hooks": {"expandedOutput": True}}))
+
+        first = config_loader.load_config()
+        assert config_loader.load_config() is first
+        assert config_loader.is_expanded_output() is True
+
+        config_path.write_text(json.dumps({"hooks": {"expandedOutput": False, "x": 1}}), encoding="utf-8")
+        st = config_path.stat()
+        os.utime(config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert config_loader.load_config() is not first
+        assert config_loader.is_expanded_output() is False
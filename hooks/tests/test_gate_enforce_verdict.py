@@ -29,11 +29,11 @@ hook_mod = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(hook_mod)
 
 
-def run_hook(monkeypatch, capsys, tool_input):
+def run_hook(monkeypatch, capsys, tool_input, tool_name="mcp__claude_prompts_mcp__prompt_engine"):
     payload = {
         "session_id": "gate-verdict-test",
         "hook_event_name": "PreToolUse",
-        "tool_name": "mcp__claude_prompts_mcp__prompt_engine",
+        "tool_name": tool_name,
         "tool_input": tool_input,
     }
     monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps(payload)))
@@ -98,3 +98,10 @@ class TestLegacyStringVerdict:
         )
         assert code == 0
         assert out.get("hookSpecificOutput", {}).get("permissionDecision") != "deny"
+
+
+class TestToolNameFilter:
+    def test_other_tools_are_ignored(self, monkeypatch, capsys):
+        verdict = {"chain_id": "chain-demo#1", "gate_verdict": "GATE_REVIEW: FAIL - missing tests"}
+        for tool_name in ("Bash", "mcp__claude_prompts_mcp__prompt_engine_docs"):
+            assert run_hook(monkeypatch, capsys, verdict, tool_name=tool_name) == (0, {})
@@ -0,0 +1,72 @@
+"""
+Tests for hooks/lib/json_codec.py.
+
+Covers:
+- dumps/loads round trips with and without orjson
+- compact and indented output shape parity between backends
+- read_stdin_bytes for binary and text-only stdin
+- write_stdout for binary and text-only stdout
+- deny's PreToolUse response shape
+"""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+HOOKS_LIB = Path(__file__).parent.parent / "lib"
+sys.path.insert(0, str(HOOKS_LIB))
+
+import json_codec
+
+PAYLOAD = {"goal": "café “quotes”", "n": [1, 2.5, None, True], "nested": {"k": "v"}}
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param and not json_codec.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(json_codec, "HAS_ORJSON", request.param)
+    return request.param
+
+
+class TestJsonCodec:
+    def test_round_trip(self, backend):
+        assert json_codec.loads(json_codec.dumps(PAYLOAD)) == PAYLOAD
+        assert json_codec.loads(json_codec.dumps(PAYLOAD, indent=True).decode("utf-8")) == PAYLOAD
+
+    def test_output_shape(self, backend):
+        assert json_codec.dumps({"a": [1, 2], "b": "é"}) == '{"a":[1,2],"b":"é"}'.encode()
+        assert json_codec.dumps({"a": 1}, indent=True) == b'{\n  "a": 1\n}'
+
+    def test_read_stdin_bytes(self, monkeypatch):
+        monkeypatch.setattr(sys, "stdin", io.StringIO('{"x": "é"}'))
+        assert json_codec.read_stdin_bytes() == '{"x": "é"}'.encode()
+        monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(b'{"y": 1}')))
+        assert json_codec.read_stdin_bytes() == b'{"y": 1}'
+
+    def test_write_stdout(self, monkeypatch):
+        text_only = io.StringIO()
+        monkeypatch.setattr(sys, "stdout", text_only)
+        json_codec.write_stdout({"x": "é"})
+        assert json_codec.loads(text_only.getvalue()) == {"x": "é"}
+
+        raw = io.BytesIO()
+        wrapper = io.TextIOWrapper(raw, encoding="utf-8")
+        monkeypatch.setattr(sys, "stdout", wrapper)
+        print("before")
+        json_codec.write_stdout({"y": 1})
+        assert raw.getvalue().decode("utf-8").splitlines() == ["before", '{"y":1}']
+
+    def test_deny(self, monkeypatch):
+        out = io.StringIO()
+        monkeypatch.setattr(sys, "stdout", out)
+        json_codec.deny('Gate "x" failed')
+        assert json_codec.loads(out.getvalue()) == {
+            "hookSpecificOutput": {
+                "hookEventName": "PreToolUse",
+                "permissionDecision": "deny",
+                "permissionDecisionReason": 'Gate "x" failed',
+            }
+        }
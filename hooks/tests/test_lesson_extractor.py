@@ -0,0 +1,198 @@
+"""
+Tests for hooks/lib/lesson_extractor.py
+
+Covers:
+- Lesson extraction: highest-confidence pattern wins, fallback path
+- Insight cleanup (filler removal, capitalization, truncation)
+- Approach extraction
+- Failure classification order
+- Error summarization
+"""
+
+import sys
+from pathlib import Path
+
+HOOKS_LIB = Path(__file__).parent.parent / "lib"
+sys.path.insert(0, str(HOOKS_LIB))
+
+import lesson_extractor
+from lesson_extractor import (
+    LESSON_PATTERNS,
+    _clean_insight,
+    classify_failure,
+    extract_approach,
+    extract_lesson,
+    summarize_error,
+)
+
+
+class TestExtractLesson:
+    def test_empty_response(self):
+        assert extract_lesson("   ") == ("No response to analyze", 0.0, None)
+
+    def test_highest_confidence_wins(self):
+        response = (
+            "So, the retry loop never terminates on its own.\n"
+            "I now realize that the mock was returning a stale token.\n"
+        )
+        lesson = extract_lesson(response)
+        assert lesson.pattern_matched == "realization"
+        assert lesson.confidence == 0.9
+        assert lesson.insight == "The mock was returning a stale token"
+
+    def test_first_pattern_kept_on_confidence_tie(self):
+        response = "The root cause is a missing await in the handler. I realize the queue is never drained."
+        lesson = extract_lesson(response)
+        # realization and root_cause share 0.9; the earlier pattern in LESSON_PATTERNS wins
+        assert lesson.pattern_matched == "realization"
+        assert lesson.insight == "The queue is never drained"
+
+    def test_short_match_is_ignored(self):
+        lesson = extract_lesson("Error: bad. Looking at the logs, the cache key omits the tenant id.")
+        assert lesson.pattern_matched == "inspection"
+        assert lesson.insight == "The cache key omits the tenant id"
+
+    def test_fallback_uses_last_sentence(self):
+        response = "Some notes.\n\nRan the suite twice without changes. Both runs produced identical output here."
+        lesson = extract_lesson(response)
+        assert lesson.pattern_matched == "fallback"
+        assert lesson.confidence == 0.3
+        assert lesson.insight == "Both runs produced identical output here."
+
+    def test_fallback_skips_trailing_code_block(self):
+        response = "Ran the suite again and compared output files carefully.\n\n```\nok\n```"
+        lesson = extract_lesson(response)
+        assert lesson.insight == "Ran the suite again and compared output files carefully."
+
+    def test_fallback_paragraphs_match_full_split(self):
+        def reference(text):
+            return [p.strip() for p in text.split("\n\n") if p.strip()][::-1][:2]
+
+        samples = [
+            "",
+            "\n\n\n",
+            "one",
+            "a\n\n\nb",
+            "a\n\n\n\nb\n\n\n\n\n",
+            "first\n \n\nsecond\n\n  \n\nthird  \n",
+            "x\n\n```\ncode\n\nmore\n```\n\n",
+        ]
+        for sample in samples:
+            assert lesson_extractor._last_paragraphs(sample, 2) == reference(sample), repr(sample)
+
+    def test_filler_removed_and_capitalized(self):
+        lesson = extract_lesson("The fix is we need to pin the dependency version in the lockfile.")
+        assert lesson.pattern_matched == "solution"
+        assert lesson.insight == "Pin the dependency version in the lockfile"
+
+    def test_stacked_filler_phrases_removed_in_order(self):
+        assert _clean_insight("I think we need to you should retry") == "Retry"
+        assert _clean_insight("Maybe you must pin it") == "Pin it"
+        # Kinds only strip in order: a hedge after "we need to" stays
+        assert _clean_insight("we need to maybe retry") == "Maybe retry"
+        assert _clean_insight(' "Perhaps retry later" ') == "Retry later"
+
+    def test_response_without_trigger_words_skips_scan(self, monkeypatch):
+        class ExplodingPattern:
+            def search(self, text):
+                raise AssertionError("lesson patterns should not run")
+
+        monkeypatch.setattr(
+            lesson_extractor,
+            "LESSON_PATTERNS",
+            [(ExplodingPattern(), confidence, name) for _, confidence, name in LESSON_PATTERNS],
+        )
+        lesson = extract_lesson("for i in range(10):\n    total += values[i] * weights[i]")
+        assert lesson.pattern_matched == "fallback"
+
+    def test_match_nested_in_another_pattern(self):
+        # root_cause sits inside the conclusion match and must still be found
+        lesson = extract_lesson("So, the root cause is a stale lockfile in the cache.")
+        assert lesson.pattern_matched == "root_cause"
+        assert lesson.insight == "A stale lockfile in the cache"
+
+    def test_prescreen_agrees_with_unscreened_search(self):
+        responses = [
+            "It turns out the fixture leaks state. Error: connection refused by upstream proxy.",
+            "Looking at the trace, the worker exits early. This means the queue is never drained.",
+            "I noticed the build failed because of a missing header. The build failed because the cache was cold.",
+            "Therefore, retries are pointless here. The solution is to raise the timeout to thirty seconds.",
+            "Issue: flaky network mocks everywhere. The issue is that mocks share a global registry.",
+            "The test fails because of ordering. Also, the error was in the serializer all along.",
+            "nothing interesting happens in this response at all",
+            # re.IGNORECASE folds these to ASCII letters; the trigger prescreen must too
+            "\u0130SSUE: the cache key omits the tenant id.",
+            "\u017fo, the cache key omits the tenant id here.",
+            "def f(x):\n    return x * 2\n\nprint(f(3))",
+        ]
+        for response in responses:
+            expected = None
+            for pattern, confidence, name in LESSON_PATTERNS:
+                match = pattern.search(response)
+                if match:
+                    insight = _clean_insight(match.group(1).strip())
+                    if len(insight) > 10 and (expected is None or confidence > expected[1]):
+                        expected = (insight, confidence, name)
+            lesson = extract_lesson(response)
+            if expected is None:
+                assert lesson.pattern_matched == "fallback"
+            else:
+                assert tuple(lesson) == expected
+
+    def test_long_insight_truncated(self):
+        lesson = extract_lesson("I realize " + "x" * 300 + ".")
+        assert len(lesson.insight) == 200
+        assert lesson.insight.endswith("...")
+
+
+class TestExtractApproach:
+    def test_action_statement(self):
+        assert extract_approach("I tried URL-encoding the password first.") == "URL-encoding the password first"
+
+    def test_unclear(self):
+        assert extract_approach("Nothing actionable here") == "Attempted fix (details unclear)"
+
+
+class TestClassifyFailure:
+    def test_categories(self):
+        assert classify_failure("SyntaxError: Unexpected token }") == "syntax_error"
+        assert classify_failure("Error: Cannot find module 'x'") == "import_error"
+        assert classify_failure("EACCES: permission denied") == "permission_error"
+        assert classify_failure("all good") == "unknown_error"
+
+    def test_earlier_category_wins(self):
+        # "fail" (test_failure) and "timeout" both present: test_failure is listed first
+        assert classify_failure("Job failed after timeout") == "test_failure"
+
+
+class TestSummarizeError:
+    def test_first_indicator_line(self):
+        output = "\n  running tests\n  Expected 3 but Received 4\n  Error: boom\n"
+        assert summarize_error(output) == "Expected 3 but Received 4"
+
+    def test_first_non_empty_line_fallback(self):
+        assert summarize_error("\n\n  all steps ok  \nsecond") == "all steps ok"
+
+    def test_truncation_and_empty(self):
+        assert summarize_error("error " + "y" * 300, max_length=20) == "error yyyyyyyyyyy..."
+        assert summarize_error("   ") == "No error output"
+
+    def test_matches_line_by_line_scan(self):
+        def reference(error_output, max_length=150):
+            lines = error_output.strip().split("\n")
+            indicators = ["error", "fail", "expected", "received", "cannot", "undefined", "null"]
+            candidates = [line for line in lines if any(ind in line.lower() for ind in indicators)]
+            candidates += [line for line in lines if line.strip()]
+            clean_line = candidates[0].strip()
+            return clean_line[: max_length - 3] + "..." if len(clean_line) > max_length else clean_line
+
+        samples = [
+            "first line\nNULL pointer here\r\nlast",
+            "TypeError: x is UNDEFINED",
+            "no indicators\nat all",
+            "  \t lead\n\nCANNOT open\n",
+            "fa\u0130l \u0131mport\nFAIL: real one",
+            "ok\nsecond Error",
+        ]
+        for sample in samples:
+            assert summarize_error(sample) == reference(sample), sample
@@ -8,6 +8,7 @@ Covers:
 - SSOT registry role classification
 """
 
+import json
 import re
 import sys
 from pathlib import Path
@@ -226,3 +227,152 @@ class TestDetectAllOperators:
         result = detect_all_operators(">>analyze")
         # No operators (>> is not an operator, it's prompt syntax)
         assert len(result) == 0
+
+    def test_table_scan_matches_per_operator_detection(self):
+        """Overlapping operators (gate's leading = vs ==>) are all still reported."""
+        messages = [
+            '@CAGEERF >>step1 --> >>step2 ==> >>step3 :: "validate"',
+            ">>a ==> >>b",
+            ">>a = x ==> >>b :: security-check",
+            ">>report #analytical * 3 --> >>summarize",
+            "#style @ReACT >>debug :: criteria:'tests pass'",
+            ">>p *2-->>>q",
+            "plain message with no operators",
+            "",
+        ]
+        for message in messages:
+            expected = {op_id: m for op_id in OPERATORS if (m := detect_operator(message, op_id))}
+            assert detect_all_operators(message) == expected, message
+
+
+# ── prompt-suggest.py single-scan chain detection ──
+
+
+def _load_prompt_suggest():
+    import importlib.util
+
+    hooks_dir = Path(__file__).resolve().parents[1]
+    spec = importlib.util.spec_from_file_location("prompt_suggest", hooks_dir / "prompt-suggest.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestPromptSuggestChainScan:
+    """The hook's single-pass scan must agree with split-then-search semantics."""
+
+    CASES = (
+        ">>analyze --> >>implement --> >>test",
+        '>>analyze scope:"backend" --> >>implement',
+        ">>step1 ==> >>step2",
+        ">>a → >>b",
+        ">>analyze",
+        '>>analyze --> >>implement :: "test it"',
+        ">>a-->>>b",
+        ">>a--->b",
+        ">>first >>second --> >>third",
+        "--> >>only",
+        ">>a --> plain text --> >>c",
+        "no prompts --> here",
+        ">> --> >>x",
+    )
+
+    def test_matches_reference(self):
+        hook = _load_prompt_suggest()
+        for message in self.CASES:
+            assert hook.detect_chain_syntax(message) == detect_chain_syntax(message), message
+
+
+class TestPromptSuggestDetectors:
+    """Precompiled detector patterns, including the no-registry fallbacks."""
+
+    def test_inline_args(self):
+        hook = _load_prompt_suggest()
+        assert hook.parse_inline_args(">>prompt scope:'global' limit:\"10\" url:http://x") == {
+            "scope": "global",
+            "limit": "10",
+        }
+
+    def test_fallback_framework_and_repetition(self, monkeypatch):
+        hook = _load_prompt_suggest()
+        monkeypatch.setattr(hook, "HAS_GENERATED_OPERATORS", False)
+        assert hook.detect_framework("@ReACT >>debug") == "react"
+        assert hook.detect_framework("mail me@example.com") is None
+        assert hook.detect_repetition(">>analyze * 5 --> >>summarize") == 5
+        assert hook.detect_repetition(">>analyze 2*3") is None
+
+    def test_operator_free_messages_skip_regex(self, monkeypatch):
+        class ExplodingPattern:
+            def search(self, text):
+                raise AssertionError("regex should have been skipped")
+
+            findall = finditer = search
+
+        hook = _load_prompt_suggest()
+        for name in ("_PROMPT_ID_RE", "_CHAIN_TOKEN_RE", "_GATE_RE"):
+            monkeypatch.setattr(hook, name, ExplodingPattern())
+        message = "please refactor the parser -> then run tests"
+        assert hook.detect_prompt_invocation(message) is None
+        assert hook.detect_chain_syntax(message) == []
+        assert hook.detect_chain_syntax(">>analyze only") == []
+        assert hook.detect_inline_gates(message) == []
+
+    def test_inline_gates_quoted_and_ids_in_message_order(self):
+        hook = _load_prompt_suggest()
+        message = ">>review :: security-check :: 'must cite sources' ::\"no todos\" :: x_1- done"
+        assert hook.detect_inline_gates(message) == ["security-check", "must cite sources", "no todos", "x_1"]
+        assert hook.detect_inline_gates(">>review :: 123 :: ''") == []
+
+    def test_arg_signature(self):
+        hook = _load_prompt_suggest()
+        arg = {"name": "query", "type": "string", "required": True, "description": "d" * 60}
+        assert hook.format_arg_signature(arg) == "query*:string"
+        assert hook.format_arg_signature(arg, include_desc=True) == f"query*:string ({'d' * 50}...)"
+        assert hook.format_arg_signature({"name": "limit", "type": "int", "description": "Max rows"}, True) == (
+            "limit:int (Max rows)"
+        )
+        assert hook.format_arg_signature({}) == "unknown:string"
+        hits = hook._arg_signature.cache_info().hits
+        assert hook.format_arg_signature(dict(arg)) == "query*:string"
+        assert hook._arg_signature.cache_info().hits == hits + 1
+
+    def test_explicit_request_matches_per_trigger_reference(self):
+        hook = _load_prompt_suggest()
+        triggers = [
+            r"\bsuggest\s+prompts?\b",
+            r"\blist\s+prompts?\b",
+            r"\bavailable\s+prompts?\b",
+            r"\bshow\s+prompts?\b",
+            r"\bwhat\s+prompts?\b",
+            r"\bprompt\s+suggestions?\b",
+            r"\brecommend\s+prompts?\b",
+        ]
+        messages = [
+            "Can you SUGGEST PROMPTS for this?",
+            "list prompt",
+            "what  prompts exist",
+            "Prompt Suggestions please",
+            "show promptsx",
+            "unlist prompts",
+            "recommend\tprompt",
+            "suggestprompts",
+            "available prompt-ids",
+            "",
+        ]
+        for message in messages:
+            expected = any(re.search(t, message.lower()) for t in triggers)
+            assert hook.detect_explicit_request(message) is expected, message
+
+
+class TestPromptSuggestOutput:
+    def test_emit_response_matches_dict_encoding(self, capsys):
+        hook = _load_prompt_suggest()
+        hook.emit_response('[MCP] "quoted" café', "<CALL-TOOL>\nprompt_engine\n</CALL-TOOL>")
+        expected = {
+            "systemMessage": '[MCP] "quoted" café',
+            "hookSpecificOutput": {
+                "hookEventName": "UserPromptSubmit",
+                "additionalContext": "<CALL-TOOL>\nprompt_engine\n</CALL-TOOL>",
+            },
+        }
+        assert json.loads(capsys.readouterr().out) == expected
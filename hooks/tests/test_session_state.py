@@ -0,0 +1,121 @@
+"""
+Tests for hooks/lib/session_state.py response parsing and reminders.
+
+Covers:
+- parse_prompt_engine_response (steps, chain ids, gate review, legacy inline gates, shell verify)
+- format_chain_reminder (inline + full)
+"""
+
+import sys
+from pathlib import Path
+
+HOOKS_LIB = Path(__file__).parent.parent / "lib"
+sys.path.insert(0, str(HOOKS_LIB))
+
+import session_state
+from session_state import format_chain_reminder, parse_prompt_engine_response
+
+
+class TestParsePromptEngineResponse:
+    def test_plain_content_returns_none(self):
+        assert parse_prompt_engine_response("Rendered prompt with no markers.") is None
+        assert parse_prompt_engine_response("") is None
+
+    def test_plain_content_runs_no_regex(self, monkeypatch):
+        class ExplodingPattern:
+            def search(self, text):
+                raise AssertionError("regex should have been skipped")
+
+            findall = search
+
+        for name in dir(session_state):
+            if name.endswith("_RE"):
+                monkeypatch.setattr(session_state, name, ExplodingPattern())
+        assert parse_prompt_engine_response("Rendered prompt: summarize the attached notes.") is None
+
+    def test_step_and_chain_id(self):
+        state = parse_prompt_engine_response("Step 2 of 5\nResume with chain-research#3 to continue")
+        assert state["current_step"] == 2
+        assert state["total_steps"] == 5
+        assert state["chain_id"] == "chain-research#3"
+
+    def test_step_variants(self):
+        assert parse_prompt_engine_response("progress 1/2")["total_steps"] == 2
+        assert parse_prompt_engine_response("Chain complete (3/3)")["current_step"] == 3
+        # chain_id parameter names are not chain ids
+        assert parse_prompt_engine_response("step 1 of 2, pass chain_id")["chain_id"] == ""
+
+    def test_dict_response_uses_content(self):
+        state = parse_prompt_engine_response({"content": "Step 1 of 2"})
+        assert state["current_step"] == 1
+
+    def test_gate_review_with_gates_list_and_attempt(self):
+        content = "**Gate Review Required** (attempt 2/3)\n**Gates**: code-quality, security\n"
+        state = parse_prompt_engine_response(content)
+        assert state["pending_gate"] == "code-quality, security"
+        assert state["shell_verify_attempts"] == 2
+
+    def test_gate_verdicts_fallback(self):
+        content = "**Review Required**\nGATE_VERDICTS:\n[1] PASS - Code Quality: ok\n[2] FAIL - Tests : no\n"
+        state = parse_prompt_engine_response(content)
+        assert state["pending_gate"] == "Code Quality, Tests"
+
+    def test_legacy_inline_gates(self):
+        content = "## Inline Gates\n### Clarity Check\n- Uses plain words\n- Short sentences\n"
+        state = parse_prompt_engine_response(content)
+        assert state["pending_gate"] == "Clarity Check"
+        assert state["gate_criteria"] == ["Uses plain words", "Short sentences"]
+
+    def test_legacy_inline_gates_criteria_capped_at_five(self):
+        bullets = "".join(f"- criterion {i}\n" for i in range(8))
+        state = parse_prompt_engine_response(f"## Inline Gates\n### Gate\n{bullets}")
+        assert state["gate_criteria"] == [f"criterion {i}" for i in range(5)]
+
+    def test_criteria_scan_stops_after_five(self, monkeypatch):
+        pulled = []
+        real = session_state._CRITERIA_RE
+
+        class CountingPattern:
+            def finditer(self, text):
+                for match in real.finditer(text):
+                    pulled.append(match)
+                    yield match
+
+        monkeypatch.setattr(session_state, "_CRITERIA_RE", CountingPattern())
+        bullets = "".join(f"- criterion {i}\n" for i in range(50))
+        parse_prompt_engine_response(f"## Inline Gates\n### Gate\n{bullets}")
+        assert len(pulled) == 5
+
+    def test_shell_verification_and_attempt(self):
+        state = parse_prompt_engine_response("Shell verification: npm test\n(Attempt 3/5)")
+        assert state["pending_shell_verify"] == "npm test"
+        assert state["shell_verify_attempts"] == 3
+
+
+class TestFormatChainReminder:
+    def test_inline_continue(self):
+        state = parse_prompt_engine_response("Step 1 of 3 chain-demo#1")
+        assert format_chain_reminder(state, mode="inline") == (
+            '[chain-demo#1] 1/3\n→ prompt_engine(chain_id:"chain-demo#1") to continue'
+        )
+
+    def test_full_with_gate(self):
+        state = parse_prompt_engine_response("Step 2 of 2\n**Gates**: g1")
+        assert format_chain_reminder(state) == (
+            '[Chain] Step 2/2\n[Gate] g1 - Submit: gate_verdict="GATE_REVIEW: PASS|FAIL - <reason>"'
+        )
+
+    def test_no_active_state_is_empty(self):
+        idle = {"chain_id": "chain-x#1", "current_step": 0, "total_steps": 3, "pending_gate": None}
+        assert format_chain_reminder(idle, mode="inline") == ""
+        assert format_chain_reminder(idle) == ""
+
+    def test_inline_final_step_has_no_action_line(self):
+        state = parse_prompt_engine_response("Step 3 of 3 chain-demo#1")
+        assert format_chain_reminder(state, mode="inline") == "[chain-demo#1] 3/3"
+
+    def test_inline_combines_gate_and_verify(self):
+        state = parse_prompt_engine_response("Step 2 of 3\n**Gates**: g1\nShell verification: npm test\n(Attempt 2/5)")
+        assert format_chain_reminder(state, mode="inline") == (
+            "[active] 2/3 | Gate: g1 | Verify: 2/5\n→ Shell verify: `npm test` will validate"
+        )
@@ -32,7 +32,7 @@ class TestSessionTracker:
         assert tracker.state["session_id"] == "test-session-003"
         assert tracker.state["original_goal"] == ""
         assert tracker.state["iterations"] == []
-        assert tracker.state["file_changes"] == {}
+        assert tracker.state["file_changes_log"] == []
 
     def test_set_goal(self, patch_workspace):
         from session_tracker import SessionTracker
@@ -62,6 +62,13 @@ class TestSessionTracker:
         assert it["approach"] == "Tried fixing the import"
         assert it["result"] == "FAIL - module not found"
 
+    def test_iteration_timestamp_matches_updated_at(self, patch_workspace):
+        from session_tracker import SessionTracker
+
+        tracker = SessionTracker("test-iter-time")
+        tracker.record_iteration("Try", "FAIL", "Lesson")
+        assert tracker.state["iterations"][0]["timestamp"] == tracker.state["updated_at"]
+
     def test_record_multiple_iterations(self, patch_workspace):
         from session_tracker import SessionTracker
 
@@ -81,8 +88,11 @@ class TestSessionTracker:
             change_type="modify",
             details="Fixed import statement",
         )
-        assert "src/auth.ts" in tracker.state["file_changes"]
-        assert len(tracker.state["file_changes"]["src/auth.ts"]) == 1
+        assert "src/auth.ts" in tracker.changes_by_file()
+        assert len(tracker.changes_by_file()["src/auth.ts"]) == 1
+        assert tracker.state["file_changes_log"] == [
+            {"file_path": "src/auth.ts", "type": "modify", "details": "Fixed import statement", "iteration": 1}
+        ]
 
     def test_generate_story_no_iterations(self, patch_workspace):
         from session_tracker import SessionTracker
@@ -105,12 +115,29 @@ class TestSessionTracker:
         assert "Iteration 1" in story
         assert "Iteration 2" in story
 
+    def test_story_cached_until_goal_or_iteration_changes(self, patch_workspace):
+        from session_tracker import SessionTracker
+
+        tracker = SessionTracker("test-story-cache")
+        tracker.set_goal("Fix the bug", "npm test")
+        tracker.record_iteration("First try", "FAIL", "Wrong approach", files_changed=["src/a.ts"])
+        story = tracker.generate_story()
+        assert "   - Files: src/a.ts" in story
+
+        tracker.record_file_change("src/a.ts", "modify", "edit")
+        assert tracker.generate_story() is story
+
+        tracker.record_iteration("Second try", "PASS", "Correct fix")
+        assert "Second try" in tracker.generate_story()
+        tracker.set_goal("Fix the other bug", "npm test")
+        assert "Fix the other bug" in tracker.generate_story()
+
     def test_generate_diff_summary_empty(self, patch_workspace):
         from session_tracker import SessionTracker
 
         tracker = SessionTracker("test-diff-empty")
-        summary = tracker.generate_diff_summary()
-        assert "No file changes" in summary
+        assert tracker.generate_diff_summary() is None
+        assert "## Git-Style Change Summary" not in tracker.generate_task_context()
 
     def test_generate_diff_summary_with_changes(self, patch_workspace):
         from session_tracker import SessionTracker
@@ -124,6 +151,48 @@ class TestSessionTracker:
         assert "src/test.ts" in summary
         assert "```diff" in summary
 
+    def test_task_context_lists_first_five_changed_files(self, patch_workspace):
+        from session_tracker import SessionTracker
+
+        tracker = SessionTracker("test-focus-files")
+        for i in range(7):
+            tracker.record_file_change(f"src/f{i}.ts", "modify", "edit")
+        tracker.record_file_change("src/f0.ts", "modify", "again")
+
+        context = tracker.generate_task_context()
+        assert "- `src/f0.ts` (2 changes)\n- `src/f1.ts` (1 changes)" in context
+        assert "`src/f4.ts`" in context
+        assert "- `src/f5.ts`" not in context
+
+    def test_iterations_capped_keeping_first_and_latest(self, patch_workspace, monkeypatch):
+        import session_tracker
+        from session_tracker import SessionTracker
+
+        monkeypatch.setattr(session_tracker, "_MAX_ITERATIONS", 5)
+        tracker = SessionTracker("test-iter-cap")
+        for i in range(1, 9):
+            tracker.record_iteration(f"Try {i}", "FAIL", "Lesson")
+
+        assert [it["number"] for it in tracker.state["iterations"]] == [1, 2, 6, 7, 8]
+        assert tracker.get_iteration_count() == 8
+        reloaded = SessionTracker("test-iter-cap")
+        assert [it["number"] for it in reloaded.state["iterations"]] == [1, 2, 6, 7, 8]
+        assert reloaded.get_iteration_count() == 8
+
+    def test_file_changes_capped_per_file(self, patch_workspace, monkeypatch):
+        import session_tracker
+        from session_tracker import SessionTracker
+
+        monkeypatch.setattr(session_tracker, "_MAX_CHANGES_PER_FILE", 3)
+        tracker = SessionTracker("test-change-cap")
+        tracker.record_file_change("src/keep.ts", "add", "once")
+        for i in range(5):
+            tracker.record_file_change("src/busy.ts", "modify", f"edit {i}")
+
+        by_file = tracker.changes_by_file()
+        assert [c["details"] for c in by_file["src/busy.ts"]] == ["edit 2", "edit 3", "edit 4"]
+        assert [c["details"] for c in by_file["src/keep.ts"]] == ["once"]
+
     def test_get_iteration_count(self, patch_workspace):
         from session_tracker import SessionTracker
 
@@ -133,6 +202,7 @@ class TestSessionTracker:
         assert tracker.get_iteration_count() == 1
         tracker.record_iteration("Try 2", "PASS", "Lesson 2")
         assert tracker.get_iteration_count() == 2
+        assert SessionTracker("test-count").get_iteration_count() == 2
 
     def test_clear_session(self, patch_workspace):
         from session_tracker import SessionTracker
@@ -161,6 +231,189 @@ class TestSessionTracker:
         assert tracker2.state["original_goal"] == "Fix auth"
         assert len(tracker2.state["iterations"]) == 1
 
+    def test_state_file_round_trips_non_ascii(self, patch_workspace):
+        import json
+
+        from session_tracker import SessionTracker
+
+        tracker = SessionTracker("test-unicode")
+        tracker.set_goal("Fix “smart quotes” in café menu", "npm test")
+        tracker.flush()
+
+        on_disk = json.loads(tracker.state_file.read_text(encoding="utf-8"))
+        assert on_disk["original_goal"] == "Fix “smart quotes” in café menu"
+        assert tracker.state_file.read_text(encoding="utf-8").startswith('{"session_id":"test-unicode",')
+        assert SessionTracker("test-unicode").state["original_goal"] == on_disk["original_goal"]
+
+    def test_corrupt_state_file_starts_fresh(self, patch_workspace):
+        from session_tracker import SessionTracker
+
+        tracker = SessionTracker("test-corrupt")
+        tracker.state_file.write_bytes(b"\xff{not json")
+        assert SessionTracker("test-corrupt").state["iterations"] == []
+
+    def test_legacy_file_changes_mapping_migrated(self, patch_workspace):
+        import json
+
+        from session_tracker import SessionTracker
+
+        tracker = SessionTracker("test-migrate")
+        legacy = {
+            "session_id": "test-migrate",
+            "original_goal": "Goal",
+            "verification_command": "npm test",
+            "working_directory": "",
+            "iterations": [],
+            "file_changes": {
+                "src/a.ts": [
+                    {"type": "modify", "details": "a1", "iteration": 1},
+                    {"type": "add", "details": "a2", "iteration": 2},
+                ],
+                "src/b.ts": [{"type": "modify", "details": "b1", "iteration": 1}],
+            },
+            "created_at": "2024-01-01T00:00:00",
+            "updated_at": "2024-01-01T00:00:00",
+        }
+        tracker.state_file.write_text(json.dumps(legacy), encoding="utf-8")
+
+        migrated = SessionTracker("test-migrate")
+        assert "file_changes" not in migrated.state
+        assert [c["details"] for c in migrated.state["file_changes_log"]] == ["a1", "b1", "a2"]
+        assert list(migrated.changes_by_file()) == ["src/a.ts", "src/b.ts"]
+
+        migrated.record_file_change("src/c.ts", "add", "c1")
+        migrated.flush()
+        assert [c["file_path"] for c in SessionTracker("test-migrate").state["file_changes_log"]][-1] == "src/c.ts"
+
+    def test_iterations_append_to_event_log(self, patch_workspace):
+        from session_tracker import SessionTracker
+
+        tracker = SessionTracker("test-events")
+        tracker.set_goal("Fix auth", "npm test")
+        tracker.flush()
+        snapshot = tracker.state_file.read_bytes()
+
+        tracker.record_iteration("First try", "FAIL", "Wrong approach")
+        tracker.record_file_change("src/auth.ts", "modify", "Changed guard")
+        tracker.flush()
+
+        # Snapshot untouched; two events appended
+        assert tracker.state_file.read_bytes() == snapshot
+        assert len(tracker.events_file.read_bytes().splitlines()) == 2
+
+        reloaded = SessionTracker("test-events")
+        assert reloaded.state["iterations"][0]["approach"] == "First try"
+        assert reloaded.changes_by_file()["src/auth.ts"][0]["iteration"] == 2
+        assert reloaded.state["created_at"] == tracker.state["created_at"]
+        assert reloaded.state["updated_at"] == tracker.state["updated_at"]
+
+    def test_snapshot_compacts_event_log(self, patch_workspace, monkeypatch):
+        import session_tracker
+        from session_tracker import SessionTracker
+
+        monkeypatch.setattr(session_tracker, "_SNAPSHOT_EVERY", 3)
+        tracker = SessionTracker("test-compact")
+        tracker.set_goal("Goal", "npm test")
+        for i in range(5):
+            tracker.record_iteration(f"Try {i}", "FAIL", "Lesson")
+
+        # First flush wrote the snapshot, the third logged event compacted; one logged since
+        assert len(tracker.events_file.read_bytes().splitlines()) == 1
+        assert len(SessionTracker("test-compact").state["iterations"]) == 5
+
+        tracker.generate_task_context()
+        assert not tracker.events_file.exists()
+        assert len(SessionTracker("test-compact").state["iterations"]) == 5
+
+    def test_replay_skips_events_already_in_snapshot(self, patch_workspace):
+        from session_tracker import SessionTracker
+
+        tracker = SessionTracker("test-crash")
+        tracker.set_goal("Goal", "npm test")
+        tracker.flush()
+        tracker.record_iteration("Try", "FAIL", "Lesson")
+        log = tracker.events_file.read_bytes()
+
+        # Simulate a crash between snapshot write and log removal, plus a torn append
+        tracker.flush_snapshot()
+        tracker.events_file.write_bytes(log + b'{"type": "itera')
+
+        assert len(SessionTracker("test-crash").state["iterations"]) == 1
+
+    def test_snapshot_replaced_atomically(self, patch_workspace, monkeypatch):
+        import session_tracker
+        from session_tracker import SessionTracker
+
+        tracker = SessionTracker("test-atomic")
+        tracker.set_goal("Goal", "npm test")
+        tracker.flush()
+        before = tracker.state_file.read_bytes()
+
+        def crash(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(session_tracker.os, "replace", crash)
+        tracker.record_iteration("Try", "FAIL", "Lesson")
+        tracker.flush_snapshot()
+
+        # Failed swap leaves the old snapshot and the event log to replay
+        assert tracker.state_file.read_bytes() == before
+        assert len(SessionTracker("test-atomic").state["iterations"]) == 1
+
+    def test_changes_buffered_until_flush(self, patch_workspace, monkeypatch):
+        import session_tracker
+        from session_tracker import SessionTracker
+
+        tracker = SessionTracker("test-buffer")
+        tracker.set_goal("Goal", "npm test")
+        tracker.flush()
+
+        appends = []
+        real_open = open
+        monkeypatch.setattr(
+            session_tracker, "open", lambda *a, **kw: appends.append(a[0]) or real_open(*a, **kw), raising=False
+        )
+        for i in range(3):
+            tracker.record_file_change(f"src/f{i}.ts", "modify", "edit")
+        assert not tracker.events_file.exists()
+        assert len(SessionTracker("test-buffer").changes_by_file()) == 0
+
+        tracker.flush()
+        assert appends == [tracker.events_file]
+        assert len(SessionTracker("test-buffer").changes_by_file()) == 3
+
+    def test_unflushed_changes_flushed_at_exit(self, patch_workspace, monkeypatch):
+        import session_tracker
+        from session_tracker import SessionTracker
+
+        registered = []
+
+        class FakeAtexit:
+            register = staticmethod(registered.append)
+            unregister = staticmethod(registered.remove)
+
+        monkeypatch.setattr(session_tracker, "atexit", FakeAtexit)
+        tracker = SessionTracker("test-atexit")
+        tracker.set_goal("Goal", "npm test")
+        tracker.record_file_change("src/a.ts", "modify", "edit")
+        assert registered == [tracker.flush]
+
+        registered[0]()
+        assert registered == []
+        assert "src/a.ts" in SessionTracker("test-atexit").changes_by_file()
+
+    def test_clear_removes_event_log(self, patch_workspace):
+        from session_tracker import SessionTracker
+
+        tracker = SessionTracker("test-clear-log")
+        tracker.set_goal("Goal", "npm test")
+        tracker.record_iteration("Try", "FAIL", "Lesson")
+        tracker.record_file_change("src/a.ts", "modify", "edit")
+        tracker.clear()
+        tracker.flush()
+        assert not tracker.state_file.exists()
+        assert not tracker.events_file.exists()
+
     def test_generate_task_context(self, patch_workspace):
         from session_tracker import SessionTracker
 
@@ -199,3 +452,19 @@ class TestClearRalphSession:
         from hook_state_store import TABLE_RALPH_SESSION_STATE, load_state
 
         assert load_state(TABLE_RALPH_SESSION_STATE, "clear-test") is None
+
+
+class TestCommandDirectory:
+    def test_first_absolute_path_parent(self, tmp_path):
+        from session_tracker import command_directory
+
+        (tmp_path / "tests").mkdir()
+        test_file = tmp_path / "tests" / "test_x.py"
+        assert command_directory(f"pytest {test_file} /other/path") == tmp_path / "tests"
+
+    def test_missing_or_absent_paths(self):
+        from session_tracker import command_directory
+
+        assert command_directory("npm test") is None
+        assert command_directory("pytest /no/such/dir/test_x.py") is None
+        assert command_directory("") is None
@@ -6,6 +6,7 @@ Covers:
 - Task file parsing (YAML frontmatter + sections)
 - Round-trip: create → render → parse
 - Result file creation and parsing
+- Pending task listing and stale task cleanup
 - Task ID generation
 """
 
@@ -140,7 +141,7 @@ class TestRenderTaskFile:
         task = TaskFile(
             metadata=metadata,
             session_story="Starting fresh.",
-            diff_summary="No file changes recorded.",
+            diff_summary=None,
             current_state="No files modified yet.",
             last_failure="No previous failure.",
             what_to_try="Start investigating.",
@@ -169,6 +170,59 @@ class TestParseTaskFile:
         assert parsed.metadata.id == "task-min"
         assert parsed.metadata.verification_command == "npm test"
 
+    def test_parses_sections(self):
+        from task_protocol import parse_task_file
+
+        content = (
+            "---\nid: task-sec\n---\n\n"
+            "## Session Story\n\nTried X\n\n### Iteration 1\nstill failing\n\n"
+            "## Current State\n\nNo files modified yet.\n\n"
+            "## Last Failure (Iteration 2)\n\n```\nboom\n```\n\n"
+            "## Instructions\n\nDo the thing\n"
+        )
+        parsed = parse_task_file(content)
+        assert parsed.session_story == "Tried X\n\n### Iteration 1\nstill failing"
+        assert parsed.current_state == "No files modified yet."
+        assert parsed.last_failure == "```\nboom\n```"
+        assert parsed.instructions == "Do the thing"
+        assert parsed.diff_summary is None
+        assert parsed.what_to_try == ""
+
+    def test_parses_unnumbered_last_failure(self):
+        from task_protocol import parse_task_file
+
+        parsed = parse_task_file("---\nid: t\n---\n\n## Last Failure\n\nboom\n")
+        assert parsed.last_failure == "boom"
+
+    def test_frontmatter_rendered_as_json(self):
+        import json
+
+        from task_protocol import TaskFile, TaskMetadata, parse_task_file, render_task_file
+
+        metadata = TaskMetadata(
+            id="task-json",
+            created="2024-01-01T00:00:00",
+            original_request="Fix “quotes” in café: menu\n---",
+            verification_command="npm test -- --grep 'a: b'",
+            max_iterations=3,
+        )
+        task = TaskFile(metadata, "Story.", "", "State.", "Failure.", "Try.", "Go.")
+        rendered = render_task_file(task)
+
+        header = rendered.split("\n---", 1)[0].removeprefix("---\n")
+        assert json.loads(header)["verification_command"] == "npm test -- --grep 'a: b'"
+        parsed = parse_task_file(rendered)
+        assert parsed.metadata.original_request == "Fix “quotes” in café: menu\n---"
+        assert parsed.metadata.max_iterations == 3
+        assert parsed.instructions == "Go."
+
+    def test_yaml_flow_mapping_frontmatter_still_parses(self):
+        from task_protocol import parse_task_file
+
+        parsed = parse_task_file("---\n{id: task-flow, max_iterations: 2}\n---\n\n## Instructions\n\nGo\n")
+        assert parsed.metadata.id == "task-flow"
+        assert parsed.metadata.max_iterations == 2
+
     def test_returns_none_for_no_frontmatter(self):
         from task_protocol import parse_task_file
 
@@ -236,6 +290,43 @@ class TestResultFile:
         assert parsed.metadata.status == "FAIL"
 
 
+class TestTaskDirectoryScans:
+    @staticmethod
+    def _touch(tasks_dir, name, age_hours=0.0):
+        import os
+        import time
+
+        path = tasks_dir / name
+        path.write_text("x")
+        mtime = time.time() - age_hours * 3600
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_pending_tasks_oldest_first_without_results(self, patch_workspace):
+        from task_protocol import _get_tasks_dir, get_pending_tasks
+
+        tasks_dir = _get_tasks_dir()
+        newer = self._touch(tasks_dir, "task-bbbb.md", age_hours=1)
+        older = self._touch(tasks_dir, "task-aaaa.md", age_hours=2)
+        self._touch(tasks_dir, "task-done.md")
+        self._touch(tasks_dir, "task-done-result.md")
+        self._touch(tasks_dir, "notes.md")
+
+        assert get_pending_tasks() == [older, newer]
+
+    def test_cleanup_removes_stale_tasks_and_their_results(self, patch_workspace):
+        from task_protocol import _get_tasks_dir, cleanup_old_tasks
+
+        tasks_dir = _get_tasks_dir()
+        self._touch(tasks_dir, "task-old.md", age_hours=30)
+        self._touch(tasks_dir, "task-old-result.md")
+        self._touch(tasks_dir, "task-orphan-result.md", age_hours=30)
+        fresh = self._touch(tasks_dir, "task-new.md")
+
+        assert cleanup_old_tasks(max_age_hours=24) == 3
+        assert sorted(p.name for p in tasks_dir.iterdir()) == [fresh.name]
+
+
 class TestGenerateTaskId:
     def test_unique_ids(self):
         from task_protocol import generate_task_id
@@ -45,6 +45,42 @@ find_cache_dir() {
     return 1
 }
 
+# Recursive copy using copy-on-write clones where the platform supports them:
+# GNU cp --reflink=auto (btrfs/XFS), BSD/macOS cp -c (APFS clonefile). Both
+# degrade to a regular copy on filesystems without clone support.
+fast_copy() {
+    local SRC="$1"
+    local DEST="$2"
+
+    if cp --reflink=auto -r "$SRC" "$DEST" 2>/dev/null; then
+        return 0
+    fi
+    if [ "$(uname -s)" = "Darwin" ] && cp -c -r "$SRC" "$DEST" 2>/dev/null; then
+        return 0
+    fi
+    cp -r "$SRC" "$DEST"
+}
+
+# Copy a directory tree into DEST_PARENT/<name>.
+# rsync only transfers files whose size/mtime changed, so repeat syncs of an
+# unchanged tree are near-instant; fast_copy is the fallback when rsync is
+# missing. Pass "--delete" as the third argument to also prune files that no
+# longer exist in the source (only safe for directories the cache never edits).
+sync_dir() {
+    local SRC="$1"
+    local DEST_PARENT="$2"
+    local DELETE_FLAG="${3:-}"
+    local NAME
+    NAME="$(basename "$SRC")"
+
+    if command -v rsync >/dev/null 2>&1; then
+        mkdir -p "$DEST_PARENT/$NAME"
+        rsync -a $DELETE_FLAG "$SRC/" "$DEST_PARENT/$NAME/"
+    else
+        fast_copy "$SRC" "$DEST_PARENT/"
+    fi
+}
+
 # Find the cache directory
 CACHE_DIR=$(find_cache_dir)
 FOUND=$?
@@ -61,8 +97,8 @@ fi
 mkdir -p "$CACHE_DIR"
 
 # Sync essential directories
-cp -r "$SOURCE_DIR/.claude-plugin" "$CACHE_DIR/"
-cp -r "$SOURCE_DIR/hooks" "$CACHE_DIR/"
+sync_dir "$SOURCE_DIR/.claude-plugin" "$CACHE_DIR" --delete
+sync_dir "$SOURCE_DIR/hooks" "$CACHE_DIR" --delete
 cp -r "$SOURCE_DIR/.mcp.json" "$CACHE_DIR/" 2>/dev/null || true
 
 # Sync server directory (needed for MCP server and cache)
@@ -79,8 +115,9 @@ if [ -d "$SOURCE_DIR/server" ]; then
         cp "$SOURCE_DIR/server/runtime-state/"*.db "$CACHE_DIR/server/runtime-state/" 2>/dev/null || true
     fi
     # Sync resources (prompts, gates, frameworks)
+    # No --delete: resources created from inside the cached install must survive.
     if [ -d "$SOURCE_DIR/server/resources" ]; then
-        cp -r "$SOURCE_DIR/server/resources" "$CACHE_DIR/server/"
+        sync_dir "$SOURCE_DIR/server/resources" "$CACHE_DIR/server"
     fi
 fi
 